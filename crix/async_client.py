@@ -1,11 +1,82 @@
-import json
-import hmac
-from datetime import datetime
-from typing import List, Optional, Tuple, AsyncIterator
-from aiohttp import ClientSession
+import time
+import asyncio
+from collections import deque
+from functools import partial
+from itertools import islice
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple, AsyncIterator, Awaitable, Callable, Iterable, TypeVar, Dict, Any
+from aiohttp import ClientSession, ClientConnectionError, ClientError
+
+from .client import APIError, _encode_json, _klines_request, _history_request, _parse_markets, _parse_tickers24, \
+    _parse_ohlcv, _parse_trades, _parse_orders, _parse_accounts, _parse_history, _parse_volume_fees, \
+    _time_windows, _newer, _payload_size, _observe, _failed
+from .cache import ResponseCache, request_key
+from .codec import JSONCodec
+from .columnar import TickerColumns, DepthColumns
+from .lazy import EAGER_MODELS, LAZY_MODELS
+from .hooks import Hooks, RequestInfo
+from .metrics import Metrics
+from .profiler import SamplingProfiler
+from .ratelimit import RateLimiter
+from .signing import Signer
+from .streaming import aiter_json_array, STREAM_CHUNK_SIZE
+from .retry import RetryPolicy, IDEMPOTENT_OPERATIONS
+from .transport import TransportConfig
+from .models import Ticker, Resolution, NewOrder, Order, Depth, Trade, Account, Ticker24, VolumeFee, \
+    Markets, MarketsChanges, OrderResult
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+async def _fan_out(items: Iterable[T], fetch: Callable[[T], Awaitable[R]], concurrency: int = 1,
+                   ordered: bool = True) -> AsyncIterator[R]:
+    """
+    Run `fetch` for each item with at most `concurrency` calls in flight and yield results.
+
+    With `concurrency` 1 (or less) items are fetched one by one, lazily, as before. In ordered mode no more
+    than `concurrency` calls are started ahead of the consumer, so the iterator stays lazy.
+    Pending calls are cancelled if the consumer stops iteration early.
 
-from .client import APIError
-from .models import Ticker, Resolution, NewOrder, Order, Symbol, Depth, Trade, Account, Ticker24, VolumeFee
+    :param items: arguments for `fetch`
+    :param fetch: coroutine function invoked once per item
+    :param concurrency: maximum number of simultaneous calls
+    :param ordered: yield results in items order (True) or as soon as they finish (False)
+    :return: async iterator of results
+    """
+    if concurrency <= 1:
+        for item in items:
+            yield await fetch(item)
+        return
+
+    if ordered:
+        # no more than `concurrency` results are fetched ahead of the consumer
+        items = iter(items)
+        pending = deque(asyncio.ensure_future(fetch(item)) for item in islice(items, concurrency))
+        try:
+            while pending:
+                result = await pending[0]
+                pending.popleft()
+                pending.extend(asyncio.ensure_future(fetch(item)) for item in islice(items, 1))
+                yield result
+        finally:
+            for task in pending:
+                task.cancel()
+        return
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(item: T) -> R:
+        async with semaphore:
+            return await fetch(item)
+
+    tasks = [asyncio.ensure_future(run(item)) for item in items]
+    try:
+        for future in asyncio.as_completed(tasks):
+            yield await future
+    finally:
+        for task in tasks:
+            task.cancel()
 
 
 class AsyncClient:
@@ -17,10 +88,37 @@ class AsyncClient:
     - 'mvp' - testnet sandbox with full-wipe each 2nd week (usually)
     - 'prod' - mainnet, production environment with real currency
 
-    Disable `cache_market` if latest symbols info are always required
+    Disable `cache_market` if latest symbols info are always required. Symbols added, removed or changed
+    by the latest markets refresh are available in `market_changes`.
+
+    Connection pool could be tuned by `transport` or shared with other clients by `session`.
+
+    Requests are paced by `rate_limiter` if provided. Read-only operations are repeated on transient errors
+    according to `retry` policy if provided. Responses of public read-only operations are kept in `cache`
+    if provided (with `cache` markets expire by TTL instead of `cache_market`).
+
+    Requests are encoded and responses are decoded by `codec` (by default - standard library `json`).
+
+    Enable `lazy_models` to get tickers, offers, orders and trades as raw-backed objects
+    (see :mod:`crix.lazy`) which convert fields on first access.
+
+    Per-operation request counts, errors, latency and bytes are collected to `metrics` if provided
+    (see :mod:`crix.metrics`). Requests could be traced by `hooks` (see :mod:`crix.hooks`) and
+    sampled by `profiler` (see :mod:`crix.profiler`).
+
+    Enable `coalesce` to share one in-flight request between concurrent identical read-only calls
+    (ex: many coroutines calling `fetch_order_book('BTC_USDT')` at the same time): all callers
+    receive the same parsed result object, so it should not be modified.
+
+    Client could be used as an async context manager which calls `close` on exit.
     """
 
-    def __init__(self, *, env: str = 'mvp', cache_market: bool = True, session: ClientSession = None):
+    def __init__(self, *, env: str = 'mvp', cache_market: bool = True, session: ClientSession = None,
+                 transport: Optional[TransportConfig] = None, rate_limiter: Optional[RateLimiter] = None,
+                 retry: Optional[RetryPolicy] = None, cache: Optional[ResponseCache] = None,
+                 coalesce: bool = False, codec: Optional[JSONCodec] = None, lazy_models: bool = False,
+                 metrics: Optional[Metrics] = None, hooks: Optional[Hooks] = None,
+                 profiler: Optional[SamplingProfiler] = None):
         self.environment = env
         if env == 'prod':
             self._base_url = 'https://crix.io'
@@ -28,8 +126,34 @@ class AsyncClient:
             self._base_url = 'https://{}.crix.io'.format(env)
         self._base_url += '/api/v1'
         self.__cache_market = cache_market
-        self.__market_cache = None
-        self._session = session or ClientSession()
+        self.__market_cache: Optional[Markets] = None
+        self.market_changes = MarketsChanges(added=(), removed=(), changed=())
+        self.__own_session = session is None
+        if session is None:
+            session = transport.async_session() if transport is not None else ClientSession()
+        self._session = session
+        self._rate_limiter = rate_limiter
+        self._retry = retry
+        self._cache = cache
+        self._codec = codec or JSONCodec()
+        self._models = LAZY_MODELS if lazy_models else EAGER_MODELS
+        self._metrics = metrics
+        self._hooks = hooks
+        self._profiler = profiler
+        self._in_flight: Optional[Dict[tuple, asyncio.Future]] = {} if coalesce else None
+
+    async def close(self):
+        """
+        Release connections of the session created by the client (provided `session` is left open)
+        """
+        if self.__own_session:
+            await self._session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
 
     async def fetch_currency_codes(self) -> List[str]:
         """
@@ -37,26 +161,29 @@ class AsyncClient:
 
         :return: list of formatted currencies codes
         """
-        data = await self.fetch_markets()
-        return [(sym.base + "_" + sym.quote).lower() for sym in data]
+        markets = await self.fetch_markets()
+        return list(markets.currency_codes)
 
-    async def fetch_markets(self, force: bool = False) -> Tuple[Symbol]:
+    async def fetch_markets(self, force: bool = False) -> Markets:
         """
         Get list of all symbols on the exchange. Also includes symbol details like precision, quote, base and e.t.c.
         It's a good idea to cache result of this function after first invoke
 
         :param force: don't use cached symbols
-        :return: list of supported symbols
-        """
-        if not self.__cache_market or force or self.__market_cache is None:
-            symbols = []
-            async with self._session.get(self._base_url + '/info/symbols') as req:
-                await APIError.async_ensure('fetch-markets', req)
-                data = await req.json()
-            for info in (data['symbol'] or []):
-                symbols.append(Symbol.from_json(info))
-            self.__market_cache = tuple(symbols)
-        return self.__market_cache
+        :return: list of supported symbols indexed by name, base and quote currency
+        """
+        if self._cache is not None:
+            if force:
+                self._cache.invalidate('fetch-markets')
+            markets = await self._request('fetch-markets', 'GET', '/info/symbols', parse=_parse_markets)
+        elif not self.__cache_market or force or self.__market_cache is None:
+            markets = await self._request('fetch-markets', 'GET', '/info/symbols', parse=_parse_markets)
+        else:
+            return self.__market_cache
+        if markets is not self.__market_cache:
+            self.market_changes = markets.diff(self.__market_cache)
+            self.__market_cache = markets
+        return markets
 
     async def fetch_order_book(self, symbol: str, level_aggregation: Optional[str] = None) -> Depth:
         """
@@ -72,9 +199,24 @@ class AsyncClient:
         if level_aggregation is not None:
             req['strLevelAggregation'] = level_aggregation
 
-        async with self._session.post(self._base_url + '/depths', json={'req': req}) as req:
-            await APIError.async_ensure('fetch-order-book', req)
-            return Depth.from_json(await req.json())
+        return await self._request('fetch-order-book', 'POST', '/depths', json={'req': req},
+                                   parse=partial(Depth.from_json, offer=self._models.offer))
+
+    async def fetch_order_book_columns(self, symbol: str, level_aggregation: Optional[str] = None) -> DepthColumns:
+        """
+        Same as `fetch_order_book` but returns array-backed order book with fast queries (requires numpy).
+
+        :param symbol: interesting symbol name
+        :param level_aggregation: aggregate by rounding numbers (if not defined - no aggregation)
+        :return: order depth book columns
+        """
+        req = {
+            'symbolName': symbol
+        }
+        if level_aggregation is not None:
+            req['strLevelAggregation'] = level_aggregation
+        return await self._request('fetch-order-book-columns', 'POST', '/depths', json={'req': req},
+                                   parse=DepthColumns.from_json)
 
     async def fetch_ticker(self) -> List[Ticker24]:
         """
@@ -82,13 +224,7 @@ class AsyncClient:
 
         :return: list of tickers
         """
-        tickers = []
-        async with self._session.get(self._base_url + '/tickers24') as req:
-            await APIError.async_ensure('ticker', req)
-            data = await req.json()
-        for info in data['ohlc']:
-            tickers.append(Ticker24.from_json(info))
-        return tickers
+        return await self._request('ticker', 'GET', '/tickers24', parse=_parse_tickers24)
 
     async def fetch_ohlcv(self, symbol: str, utc_start_time: datetime, utc_end_time: datetime,
                           resolution: Resolution = Resolution.one_minute,
@@ -106,22 +242,64 @@ class AsyncClient:
         :param limit: maximum number of entries in a response
         :return: list of ticker
         """
-        tickers = []
-        async with self._session.post(self._base_url + '/klines',
-                                      json={
-                                          'req': {
-                                              'startTime': int(utc_start_time.timestamp() * 1000),
-                                              'endTime': int(utc_end_time.timestamp() * 1000),
-                                              'symbolName': symbol,
-                                              'resolution': resolution.value,
-                                              'limit': limit,
-                                          }
-                                      }) as req:
-            await APIError.async_ensure('fetch-ohlcv', req)
-            data = await req.json()
-        for info in (data['ohlc'] or []):
-            tickers.append(Ticker.from_json(info))
-        return tickers
+        # the latest candle is still open and could change
+        closed = utc_end_time.timestamp() + resolution.interval.total_seconds() <= time.time()
+        return await self._request('fetch-ohlcv', 'POST', '/klines',
+                                   json=_klines_request(symbol, utc_start_time, utc_end_time, resolution, limit),
+                                   parse=partial(_parse_ohlcv, model=self._models.ticker), cache=closed)
+
+    async def fetch_ohlcv_range(self, symbol: str, utc_start_time: datetime, utc_end_time: datetime,
+                                resolution: Resolution = Resolution.one_minute, limit: int = 1000,
+                                concurrency: int = 1) -> AsyncIterator[Ticker]:
+        """
+        Get K-Lines for specific symbol in a time frame of any length.
+
+        The time frame is split into windows of `limit` K-lines which are fetched by `fetch_ohlcv`
+        (up to `concurrency` windows simultaneously). K-lines are yielded in time order
+        without duplicates on windows boundaries as soon as their window arrives.
+
+        :param symbol: K-Line symbol name
+        :param utc_start_time: earliest interesting time
+        :param utc_end_time: latest interesting time
+        :param resolution: K-line resolution (by default 1-minute)
+        :param limit: maximum number of entries in a response per window (at least 2)
+        :param concurrency: maximum number of windows fetched simultaneously
+        :return: async iterator of tickers
+        """
+        # both window boundaries are inclusive, so window has limit - 1 intervals
+        windows = _time_windows(utc_start_time, utc_end_time, resolution.interval * (max(limit, 2) - 1))
+
+        async def fetch(window: Tuple[datetime, datetime]) -> List[Ticker]:
+            return await self.fetch_ohlcv(symbol, window[0], window[1], resolution, limit)
+
+        last = None
+        async for candles in _fan_out(windows, fetch, concurrency):
+            candles = _newer(candles, last, lambda candle: candle.open_time)
+            if candles:
+                last = candles[-1].open_time
+            for candle in candles:
+                yield candle
+
+    async def fetch_ohlcv_columns(self, symbol: str, utc_start_time: datetime, utc_end_time: datetime,
+                                  resolution: Resolution = Resolution.one_minute,
+                                  limit: int = 10, scale: Optional[int] = None) -> TickerColumns:
+        """
+        Same as `fetch_ohlcv` but returns columnar result: numpy arrays of times and prices (requires numpy).
+
+        :param symbol: K-Line symbol name
+        :param utc_start_time: earliest interesting time
+        :param utc_end_time: latest interesting time
+        :param resolution: K-line resolution (by default 1-minute)
+        :param limit: maximum number of entries in a response
+        :param scale: store prices and volume as int64 with the number of decimal digits (None - float64)
+        :return: K-lines columns
+        """
+        closed = utc_end_time.timestamp() + resolution.interval.total_seconds() <= time.time()
+        return await self._request('fetch-ohlcv-columns', 'POST', '/klines',
+                                   json=_klines_request(symbol, utc_start_time, utc_end_time, resolution, limit),
+                                   parse=lambda data: TickerColumns.from_json(data['ohlc'] or [], symbol,
+                                                                              resolution.value, scale),
+                                   cache=closed)
 
     async def fetch_trades(self, symbol: str, limit: int = 100) -> List[Trade]:
         """
@@ -131,18 +309,12 @@ class AsyncClient:
         :param limit: maximum number of trades (could not be more then 1000)
         :return: list of trades
         """
-        async with self._session.post(self._base_url + '/trades', json={
+        return await self._request('fetch-trades', 'POST', '/trades', json={
             'req': {
                 'symbolName': symbol,
                 'limit': limit,
             }
-        }) as req:
-            await APIError.async_ensure('fetch-trades', req)
-            data = await req.json()
-        trades = []
-        for info in (data['trades'] or []):
-            trades.append(Trade.from_json(info))
-        return trades
+        }, parse=partial(_parse_trades, model=self._models.trade))
 
     async def fetch_volume_fees(self, symbol: str) -> List[VolumeFee]:
         """
@@ -151,15 +323,157 @@ class AsyncClient:
         :param symbol: symbol name
         :return: list of volume fee
         """
-
-        async with self._session.post(self._base_url + '/info/fee/volume', json={
+        return await self._request('fetch-volume-fees', 'POST', '/info/fee/volume', json={
             'req': {
                 'symbolName': symbol,
             }
-        }) as req:
-            await APIError.async_ensure('fetch-volume-fees', req)
-            data = await req.json()
-        return [VolumeFee.from_json(record) for record in data['fees']]
+        }, parse=_parse_volume_fees)
+
+    async def _request(self, operation: str, method: str, path: str, parse: Optional[Callable[[dict], R]] = None,
+                       cache: bool = True, profiled: Optional[bool] = None, **kwargs) -> R:
+        """
+        Make request to the API endpoint and decode response
+
+        :param operation: logical operation name
+        :param method: HTTP method
+        :param path: API path relative to the base URL (ex: '/depths')
+        :param parse: function to build result from decoded JSON (if not defined - decoded JSON returned as-is)
+        :param cache: allow to use response cache for the request
+        :param profiled: record phases of the call to the profiler (if not defined - sampled by the profiler)
+        :param kwargs: additional parameters for the session request
+        :return: decoded JSON response or parsed result
+        """
+        if profiled is None:
+            profiled = self._profiler is not None and self._profiler.sample()
+        cached = cache and self._cache is not None and operation in self._cache.ttl
+        coalesced = self._in_flight is not None and operation in IDEMPOTENT_OPERATIONS
+        if not cached and not coalesced:
+            return await self.__send(operation, method, path, parse, profiled, kwargs)
+        key = request_key(operation, method, self._base_url + path, kwargs)
+        if cached:
+            found, value = self._cache.get(key)
+            if found:
+                return value
+        if coalesced:
+            future = self._in_flight.get(key)
+            if future is None:
+                future = asyncio.ensure_future(self.__send(operation, method, path, parse, profiled, kwargs))
+                self._in_flight[key] = future
+                future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+            # shield: cancellation of one caller should not cancel request for others
+            result = await asyncio.shield(future)
+        else:
+            result = await self.__send(operation, method, path, parse, profiled, kwargs)
+        if cached:
+            self._cache.put(key, result)
+        return result
+
+    async def _stream(self, operation: str, method: str, path: str, key: Optional[str] = None,
+                      **kwargs) -> AsyncIterator[Any]:
+        """
+        Make request to the API endpoint and decode elements of JSON array in response as they arrive
+
+        :param operation: logical operation name
+        :param method: HTTP method
+        :param path: API path relative to the base URL (ex: '/depths')
+        :param key: field of the response object with the array (None - response is the array)
+        :param kwargs: additional parameters for the session request
+        :return: async iterator of decoded array elements
+        """
+        kwargs = _encode_json(self._codec, kwargs)
+        retry = self._retry if operation in IDEMPOTENT_OPERATIONS else None
+        url = self._base_url + path
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            req = None
+            sent = 0.0
+            try:
+                if self._rate_limiter is not None:
+                    await self._rate_limiter.async_acquire(path)
+                sent = self.__before_request(operation, method, url, kwargs, attempt)
+                req = await self._session.request(method, url, **kwargs)
+                await APIError.async_ensure(operation, req)
+                break
+            except (APIError, ClientConnectionError, asyncio.TimeoutError) as err:
+                if req is not None:
+                    req.release()
+                self.__failed(operation, method, url, kwargs, attempt, sent, err)
+                if retry is None or (isinstance(err, APIError) and err.code not in retry.statuses):
+                    raise
+                delay = retry.delay(attempt, time.monotonic() - started, getattr(err, 'retry_after', None))
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+        if self._metrics is not None or self._hooks is not None:
+            info = RequestInfo(operation=operation, method=method, url=url, payload_size=_payload_size(kwargs),
+                               attempt=attempt, status=req.status)
+            _observe(info, self._metrics, self._hooks, None)
+        try:
+            async for element in aiter_json_array(req.content.iter_chunked(STREAM_CHUNK_SIZE), key):
+                yield element
+        finally:
+            req.release()
+
+    async def __send(self, operation: str, method: str, path: str, parse: Optional[Callable[[dict], R]],
+                     profiled: bool, kwargs: dict) -> R:
+        kwargs = _encode_json(self._codec, kwargs)
+        retry = self._retry if operation in IDEMPOTENT_OPERATIONS else None
+        url = self._base_url + path
+        measured = self._metrics is not None or self._hooks is not None or profiled
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            sent = 0.0
+            try:
+                if self._rate_limiter is not None:
+                    await self._rate_limiter.async_acquire(path)
+                sent = self.__before_request(operation, method, url, kwargs, attempt)
+                async with self._session.request(method, url, **kwargs) as req:
+                    await APIError.async_ensure(operation, req)
+                    body = await req.read()
+                break
+            except (APIError, ClientConnectionError, asyncio.TimeoutError) as err:
+                self.__failed(operation, method, url, kwargs, attempt, sent, err)
+                if retry is None or (isinstance(err, APIError) and err.code not in retry.statuses):
+                    raise
+                delay = retry.delay(attempt, time.monotonic() - started, getattr(err, 'retry_after', None))
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+        if not measured:
+            data = self._codec.loads(body)
+            return data if parse is None else parse(data)
+        received = time.perf_counter()
+        data = self._codec.loads(body)
+        decoded = time.perf_counter()
+        if parse is not None:
+            data = parse(data)
+        info = RequestInfo(operation=operation, method=method, url=url, payload_size=_payload_size(kwargs),
+                           attempt=attempt, status=req.status, response_size=len(body), network=received - sent,
+                           decode=decoded - received, parse=time.perf_counter() - decoded)
+        _observe(info, self._metrics, self._hooks, self._profiler if profiled else None)
+        return data
+
+    def __before_request(self, operation: str, method: str, url: str, kwargs: dict, attempt: int) -> float:
+        """
+        Call `before_request` hook. Returns start time of the attempt (after rate limiter wait)
+        """
+        if self._hooks is not None and self._hooks.before_request is not None:
+            self._hooks.before_request(RequestInfo(operation=operation, method=method, url=url,
+                                                   payload_size=_payload_size(kwargs), attempt=attempt))
+        return time.perf_counter()
+
+    def __failed(self, operation: str, method: str, url: str, kwargs: dict, attempt: int, sent: float,
+                 err: Exception):
+        if self._metrics is None and self._hooks is None:
+            return
+        info = RequestInfo(operation=operation, method=method, url=url, payload_size=_payload_size(kwargs),
+                           attempt=attempt, status=getattr(err, 'code', None),
+                           network=time.perf_counter() - sent if sent else None)
+        _failed(info, err, self._metrics, self._hooks)
 
 
 class AsyncAuthorizedClient(AsyncClient):
@@ -176,12 +490,18 @@ class AsyncAuthorizedClient(AsyncClient):
     """
 
     def __init__(self, token: str, secret: str, *, env: str = 'mvp', cache_market: bool = True,
-                 session: ClientSession = None):
-        super().__init__(env=env, cache_market=cache_market, session=session)
-        self.__token = token
-        self.__secret = secret
-
-    async def fetch_open_orders(self, *symbols: str, limit: int = 1000) -> AsyncIterator[Order]:
+                 session: ClientSession = None, transport: Optional[TransportConfig] = None,
+                 rate_limiter: Optional[RateLimiter] = None, retry: Optional[RetryPolicy] = None,
+                 cache: Optional[ResponseCache] = None, coalesce: bool = False, codec: Optional[JSONCodec] = None,
+                 lazy_models: bool = False, metrics: Optional[Metrics] = None, hooks: Optional[Hooks] = None,
+                 profiler: Optional[SamplingProfiler] = None):
+        super().__init__(env=env, cache_market=cache_market, session=session, transport=transport,
+                         rate_limiter=rate_limiter, retry=retry, cache=cache, coalesce=coalesce,
+                         codec=codec, lazy_models=lazy_models, metrics=metrics, hooks=hooks, profiler=profiler)
+        self.__signer = Signer(token, secret)
+
+    async def fetch_open_orders(self, *symbols: str, limit: int = 1000, concurrency: int = 1,
+                                ordered: bool = True) -> AsyncIterator[Order]:
         """
         Get all open orders for the user.
 
@@ -190,25 +510,29 @@ class AsyncAuthorizedClient(AsyncClient):
             request to query all supported symbols if symbols parameter
             not specified.
 
+        .. note::
+            With `concurrency` more than 1 up to `concurrency` per-symbol requests are made at the same time.
+            Results are grouped by symbol either in symbols order (`ordered`) or in order of completion.
 
         :param symbols: filter orders by symbols. if not specified - all symbols queried and used
         :param limit: maximum number of orders for each symbol
+        :param concurrency: maximum number of simultaneous requests
+        :param ordered: keep symbols order (True) or yield orders as soon as request finished (False)
         :return: iterator of orders definitions
         """
         if not symbols:
             markets = await self.fetch_markets()
-            symbols = [sym.name for sym in markets]
-        for symbol in symbols:
-            response = await self.__signed_request('fetch-open-orders', self._base_url + '/user/orders/open', {
-                'req': {
-                    'limit': limit,
-                    'symbolName': symbol
-                }
-            })
-            for info in (response['orders'] or []):
-                yield Order.from_json(info)
+            symbols = markets.names
+
+        async def fetch(symbol: str) -> List[Order]:
+            return await self.__fetch_orders('fetch-open-orders', '/user/orders/open', symbol, limit)
 
-    async def fetch_closed_orders(self, *symbols: str, limit: int = 1000) -> AsyncIterator[Order]:
+        async for orders in _fan_out(symbols, fetch, concurrency, ordered):
+            for order in orders:
+                yield order
+
+    async def fetch_closed_orders(self, *symbols: str, limit: int = 1000, concurrency: int = 1,
+                                  ordered: bool = True) -> AsyncIterator[Order]:
         """
         Get complete (filled, canceled) orders for user
 
@@ -217,24 +541,29 @@ class AsyncAuthorizedClient(AsyncClient):
             request to query all supported symbols if symbols parameter
             not specified.
 
+        .. note::
+            With `concurrency` more than 1 up to `concurrency` per-symbol requests are made at the same time.
+            Results are grouped by symbol either in symbols order (`ordered`) or in order of completion.
+
         :param symbols: filter orders by symbols. if not specified - all symbols queried and used
         :param limit: maximum number of orders for each symbol
+        :param concurrency: maximum number of simultaneous requests
+        :param ordered: keep symbols order (True) or yield orders as soon as request finished (False)
         :return: iterator of orders definitions
         """
         if not symbols:
             markets = await self.fetch_markets()
-            symbols = [sym.name for sym in markets]
-        for symbol in symbols:
-            response = await self.__signed_request('fetch-closed-orders', self._base_url + '/user/orders/complete', {
-                'req': {
-                    'limit': limit,
-                    'symbolName': symbol
-                }
-            })
-            for info in (response['orders'] or []):
-                yield Order.from_json(info)
+            symbols = markets.names
+
+        async def fetch(symbol: str) -> List[Order]:
+            return await self.__fetch_orders('fetch-closed-orders', '/user/orders/complete', symbol, limit)
+
+        async for orders in _fan_out(symbols, fetch, concurrency, ordered):
+            for order in orders:
+                yield order
 
-    async def fetch_orders(self, *symbols: str, limit: int = 1000) -> AsyncIterator[Order]:
+    async def fetch_orders(self, *symbols: str, limit: int = 1000, concurrency: int = 1,
+                           ordered: bool = True) -> AsyncIterator[Order]:
         """
         Get opened and closed orders filtered by symbols. If no symbols specified - all symbols are used.
         Basically the function acts as union of fetch_open_orders and fetch_closed_orders.
@@ -244,20 +573,34 @@ class AsyncAuthorizedClient(AsyncClient):
             request to query all supported symbols if symbols parameter
             not specified.
 
+        .. note::
+            With `concurrency` more than 1 up to `concurrency` requests are made at the same time.
+            In `ordered` mode orders are still sorted from open to close for each symbol.
+
         :param symbols: symbols: filter orders by symbols. if not specified - used all symbols
         :param limit: maximum number of orders for each symbol for each state (open, close)
+        :param concurrency: maximum number of simultaneous requests
+        :param ordered: keep symbols order (True) or yield orders as soon as request finished (False)
         :return: iterator of orders definitions sorted from open to close
         """
         if not symbols:
             markets = await self.fetch_markets()
-            symbols = [sym.name for sym in markets]
+            symbols = markets.names
+        pages = []
         for symbol in symbols:
-            async for order in self.fetch_open_orders(symbol, limit=limit):
-                yield order
-            async for order in self.fetch_closed_orders(symbol, limit=limit):
+            pages.append(('fetch-open-orders', '/user/orders/open', symbol))
+            pages.append(('fetch-closed-orders', '/user/orders/complete', symbol))
+
+        async def fetch(page: Tuple[str, str, str]) -> List[Order]:
+            operation, path, symbol = page
+            return await self.__fetch_orders(operation, path, symbol, limit)
+
+        async for orders in _fan_out(pages, fetch, concurrency, ordered):
+            for order in orders:
                 yield order
 
-    async def fetch_my_trades(self, *symbols: str, limit: int = 1000) -> AsyncIterator[Trade]:
+    async def fetch_my_trades(self, *symbols: str, limit: int = 1000, concurrency: int = 1,
+                              ordered: bool = True, stream: bool = False) -> AsyncIterator[Trade]:
         """
         Get all trades for the user. There is some gap (a few ms) between time when trade is actually created and time
         when it becomes visible for the user.
@@ -267,22 +610,44 @@ class AsyncAuthorizedClient(AsyncClient):
             request to query all supported symbols if symbols parameter
             not specified.
 
+        .. note::
+            With `concurrency` more than 1 up to `concurrency` per-symbol requests are made at the same time.
+            Results are grouped by symbol either in symbols order (`ordered`) or in order of completion.
+
         :param symbols: filter trades by symbols. if not specified - used all symbols
         :param limit: maximum number of trades for each symbol
+        :param concurrency: maximum number of simultaneous requests
+        :param ordered: keep symbols order (True) or yield trades as soon as request finished (False)
+        :param stream: decode responses incrementally and yield trades while they are being received
+                       (symbols are requested one by one)
         :return: iterator of trade definition
         """
         if not symbols:
             markets = await self.fetch_markets()
-            symbols = [sym.name for sym in markets]
-        for symbol in symbols:
-            response = await self.__signed_request('fetch-my-trades', self._base_url + '/user/trades', {
+            symbols = markets.names
+
+        if stream:
+            for symbol in symbols:
+                async for info in self.__signed_stream('fetch-my-trades', '/user/trades', {
+                    'req': {
+                        'limit': limit,
+                        'symbolName': symbol
+                    }
+                }, key='trades'):
+                    yield self._models.trade.from_json(info)
+            return
+
+        async def fetch(symbol: str) -> List[Trade]:
+            return await self.__signed_request('fetch-my-trades', '/user/trades', {
                 'req': {
                     'limit': limit,
                     'symbolName': symbol
                 }
-            })
-            for info in (response['trades'] or []):
-                yield Trade.from_json(info)
+            }, parse=partial(_parse_trades, model=self._models.trade))
+
+        async for trades in _fan_out(symbols, fetch, concurrency, ordered):
+            for trade in trades:
+                yield trade
 
     async def fetch_balance(self) -> List[Account]:
         """
@@ -290,8 +655,7 @@ class AsyncAuthorizedClient(AsyncClient):
 
         :return: list of all accounts
         """
-        response = await self.__signed_request('fetch-balance', self._base_url + '/user/accounts', {})
-        return [Account.from_json(info) for info in (response['accounts'] or [])]
+        return await self.__signed_request('fetch-balance', '/user/accounts', {}, parse=_parse_accounts)
 
     async def cancel_order(self, order_id: int, symbol: str) -> Order:
         """
@@ -301,13 +665,57 @@ class AsyncAuthorizedClient(AsyncClient):
         :param symbol: symbol names same as in placed order
         :return: order definition with filled field (also includes filled quantity)
         """
-        response = await self.__signed_request('cancel-order', self._base_url + '/user/order/cancel', {
+        return await self.__signed_request('cancel-order', '/user/order/cancel', {
             'req': {
                 'orderId': order_id,
                 'symbolName': symbol,
             }
-        })
-        return Order.from_json(response)
+        }, parse=self._models.order.from_json)
+
+    async def cancel_all(self, *symbols: str, concurrency: int = 1) -> List[OrderResult]:
+        """
+        Cancel all open orders of the user with up to `concurrency` cancel requests at the same time.
+        Open orders are scanned by one request per symbol (also up to `concurrency` at the same time)
+        and cancelled as soon as they are found, so the scan and the cancellation overlap.
+        Failure of one scan or one cancel doesn't abort others.
+
+        :param symbols: cancel orders only of the symbols. if not specified - used all symbols
+        :param concurrency: maximum number of simultaneous cancel requests
+        :return: results of cancellation in order of the scan followed by failed scans
+                 (result with symbol name as `request`)
+        """
+        if not symbols:
+            markets = await self.fetch_markets()
+            symbols = markets.names
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+        failures = []
+
+        async def scan(symbol: str) -> List[Order]:
+            try:
+                return await self.__fetch_orders('fetch-open-orders', '/user/orders/open', symbol, 1000)
+            except (APIError, ClientError, asyncio.TimeoutError) as err:
+                failures.append(OrderResult(request=symbol, order=None, error=err))
+                return []
+
+        async def cancel(order: Order) -> OrderResult:
+            try:
+                return OrderResult(request=order, order=await self.cancel_order(order.id, order.symbol_name),
+                                   error=None)
+            except (APIError, ClientError, asyncio.TimeoutError) as err:
+                return OrderResult(request=order, order=None, error=err)
+            finally:
+                semaphore.release()
+
+        tasks = []
+        try:
+            async for orders in _fan_out(symbols, scan, concurrency, ordered=False):
+                for order in orders:
+                    await semaphore.acquire()
+                    tasks.append(asyncio.ensure_future(cancel(order)))
+        finally:
+            # started cancels are completed even if the caller is cancelled
+            results = await asyncio.gather(*tasks)
+        return list(results) + failures
 
     async def create_order(self, new_order: NewOrder) -> Order:
         """
@@ -316,10 +724,27 @@ class AsyncAuthorizedClient(AsyncClient):
         :param new_order: order parameters
         :return: order definition with filled fields from the exchange
         """
-        response = await self.__signed_request('create-order', self._base_url + '/user/order/create', {
+        return await self.__signed_request('create-order', '/user/order/create', {
             "req": new_order.to_json()
-        })
-        return Order.from_json(response)
+        }, parse=self._models.order.from_json)
+
+    async def create_orders(self, new_orders: Iterable[NewOrder], concurrency: int = 1) -> List[OrderResult]:
+        """
+        Create and place several orders with up to `concurrency` requests at the same time.
+        Failure of one order doesn't abort the batch.
+
+        :param new_orders: orders parameters
+        :param concurrency: maximum number of simultaneous requests
+        :return: results in the same order as new orders
+        """
+
+        async def place(new_order: NewOrder) -> OrderResult:
+            try:
+                return OrderResult(request=new_order, order=await self.create_order(new_order), error=None)
+            except (APIError, ClientError, asyncio.TimeoutError) as err:
+                return OrderResult(request=new_order, order=None, error=err)
+
+        return [result async for result in _fan_out(new_orders, place, concurrency)]
 
     async def fetch_order(self, order_id: int, symbol_name: str) -> Optional[Order]:
         """
@@ -330,19 +755,20 @@ class AsyncAuthorizedClient(AsyncClient):
         :return: order definition or None if nothing found
         """
         try:
-            response = await self.__signed_request('fetch-order', self._base_url + '/user/order/info', {
+            return await self.__signed_request('fetch-order', '/user/order/info', {
                 "req": {
                     "orderId": order_id,
                     "symbolName": symbol_name
                 }
-            })
+            }, parse=self._models.order.from_json)
         except APIError as err:
             if 'not found' in err.text:
                 return None
             raise
-        return Order.from_json(response)
 
-    async def fetch_history(self, begin: datetime, end: datetime, currency: str) -> AsyncIterator[Ticker]:
+    async def fetch_history(self, begin: datetime, end: datetime, currency: str,
+                            window: Optional[timedelta] = None, concurrency: int = 1,
+                            stream: bool = False) -> AsyncIterator[Ticker]:
         """
         Get historical minute tickers for specified time range and currency
         There are several caveats:
@@ -350,33 +776,85 @@ class AsyncAuthorizedClient(AsyncClient):
         - it requires additional permission
         - end param should be not more then server time, otherwise error returned
         - maximum difference between earliest and latest date should be no more then 366 days
-        - it could be slow for a long time range
+        - it could be slow for a long time range (use `window` to split it)
         - mostly all points have 1 minute tick however in a very few cases gap can be a bit bigger
 
         :param begin: earliest interesting time
         :param end: latest interesting time
         :param currency: currency name in upper case
+        :param window: request time range by windows of the duration
+                       to get first tickers earlier and keep memory usage bounded
+        :param concurrency: maximum number of windows requested simultaneously
+        :param stream: decode response incrementally and yield tickers while it is being received
+                       (only without `window`)
         :return: iterator of parsed tickers
+        :raise ValueError: window is shorter than one second or both window and stream are set
+        """
+        if window is not None and window < timedelta(seconds=1):
+            # time range is requested with precision of seconds
+            raise ValueError('window should be at least one second, got {}'.format(window))
+        if window is not None and stream:
+            raise ValueError('stream is not supported with window')
+        if window is None and stream:
+            async for info in self.__signed_stream('fetch-history', '/user/rates/history',
+                                                   _history_request(begin, end, currency)):
+                yield self._models.ticker.from_json_history(info)
+            return
+        # same parsing for all requests of the operation: responses could be shared by cache or coalescing
+        parse = partial(_parse_history, model=self._models.ticker)
+        if window is None:
+            for ticker in await self.__signed_request('fetch-history', '/user/rates/history',
+                                                      _history_request(begin, end, currency), parse=parse):
+                yield ticker
+            return
+
+        async def fetch(part: Tuple[datetime, datetime]) -> List[Ticker]:
+            return await self.__signed_request('fetch-history', '/user/rates/history',
+                                               _history_request(part[0], part[1], currency), parse=parse)
+
+        last = None
+        async for tickers in _fan_out(_time_windows(begin, end, window), fetch, concurrency):
+            tickers = _newer(tickers, last, lambda ticker: ticker.open_time)
+            if tickers:
+                last = tickers[-1].open_time
+            for ticker in tickers:
+                yield ticker
+
+    async def fetch_history_columns(self, begin: datetime, end: datetime, currency: str,
+                                    scale: Optional[int] = None) -> TickerColumns:
+        """
+        Same as `fetch_history` but returns columnar result: numpy arrays of times and prices (requires numpy).
+
+        :param begin: earliest interesting time
+        :param end: latest interesting time
+        :param currency: currency name in upper case
+        :param scale: store prices and volume as int64 with the number of decimal digits (None - float64)
+        :return: historical tickers columns
         """
-        data = await self.__signed_request('fetch-history', self._base_url + '/user/rates/history', {
-            "req": {
-                "currency": currency,
-                "fromTimestamp": int(begin.timestamp()),
-                "toTimestamp": int(end.timestamp())
+        return await self.__signed_request('fetch-history-columns', '/user/rates/history',
+                                           _history_request(begin, end, currency),
+                                           parse=lambda data: TickerColumns.from_json_history(data, currency, scale))
+
+    async def __fetch_orders(self, operation: str, path: str, symbol: str, limit: int) -> List[Order]:
+        return await self.__signed_request(operation, path, {
+            'req': {
+                'limit': limit,
+                'symbolName': symbol
             }
-        })
-
-        for info in data:
-            yield Ticker.from_json_history(info)
-
-    async def __signed_request(self, operation: str, url: str, json_data: dict) -> dict:
-        payload = json.dumps(json_data).encode()
-        signer = hmac.new(self.__secret.encode(), digestmod='SHA256')
-        signer.update(payload)
-        signature = signer.hexdigest()
-        headers = {
-            'X-Api-Signed-Token': self.__token + ',' + signature,
-        }
-        async with self._session.post(url, data=payload, headers=headers) as req:
-            await APIError.async_ensure(operation, req)
-            return await req.json()
+        }, parse=partial(_parse_orders, model=self._models.order))
+
+    def __signed_stream(self, operation: str, path: str, json_data: dict,
+                        key: Optional[str] = None) -> AsyncIterator[Any]:
+        payload = self._codec.dumps(json_data)
+        return self._stream(operation, 'POST', path, key, data=payload, headers=self.__signer.headers(payload))
+
+    async def __signed_request(self, operation: str, path: str, json_data: dict,
+                               parse: Optional[Callable[[dict], R]] = None) -> R:
+        profiled = self._profiler is not None and self._profiler.sample()
+        started = time.perf_counter() if profiled else 0.0
+        payload = self._codec.dumps(json_data)
+        headers = self.__signer.headers(payload)
+        if profiled:
+            self._profiler.record(operation, 'sign', time.perf_counter() - started)
+        return await self._request(operation, 'POST', path, data=payload, headers=headers, parse=parse,
+                                   profiled=profiled)
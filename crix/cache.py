@@ -0,0 +1,125 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Dict, Any, Tuple
+
+from .signing import Signer
+
+
+def request_key(operation: str, method: str, url: str, kwargs: dict) -> tuple:
+    """
+    Build hashable key which identifies request by operation, endpoint, body and credential
+
+    :param operation: logical operation name
+    :param method: HTTP method
+    :param url: full URL of the endpoint (clients of different environments could share a cache)
+    :param kwargs: request parameters (json or data, headers)
+    :return: request key
+    """
+    # signed token header is bound to the API key: responses of different accounts never match
+    credential = (kwargs.get('headers') or {}).get(Signer.header)
+    return operation, method, url, json.dumps(kwargs.get('json'), sort_keys=True), kwargs.get('data'), credential
+
+
+class CacheStats(NamedTuple):
+    hits: int  #: number of requests served from the cache
+    misses: int  #: number of requests not found in the cache (or expired)
+    evictions: int  #: number of entries removed to keep cache size
+    size: int  #: current number of entries
+
+
+class ResponseCache:
+    """
+    Bounded cache of parsed responses with per-operation TTL and LRU eviction.
+
+    Only operations listed in `ttl` are cached (by default: markets, volume fees, tickers and closed candles).
+    Cached objects are shared between callers and should not be modified.
+    The same cache could be shared between several clients and threads.
+
+    .. highlight:: python
+    .. code-block:: python
+
+        import crix
+        from crix.cache import ResponseCache
+
+        cache = ResponseCache(ttl={**ResponseCache.DEFAULT_TTL, 'fetch-order-book': 0.5})
+        client = crix.Client(env='prod', cache=cache)
+    """
+
+    #: default time to live (in seconds) by operation name
+    DEFAULT_TTL = {
+        'fetch-markets': 300,
+        'fetch-volume-fees': 300,
+        'ticker': 5,
+        'fetch-ohlcv': 3600,  # only closed candles are cached
+    }
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[Dict[str, float]] = None):
+        self.max_size = max_size
+        self.ttl = dict(self.DEFAULT_TTL if ttl is None else ttl)
+        self.__entries: 'OrderedDict[tuple, Tuple[float, Any]]' = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def get(self, key: tuple) -> Tuple[bool, Any]:
+        """
+        Find not expired entry and mark it as recently used
+
+        :param key: request key
+        :return: pair of flag (is entry found) and cached value
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                expire_at, value = entry
+                if expire_at > time.monotonic():
+                    self.__entries.move_to_end(key)
+                    self.__hits += 1
+                    return True, value
+                del self.__entries[key]
+            self.__misses += 1
+            return False, None
+
+    def put(self, key: tuple, value: Any):
+        """
+        Save value if operation (first item of the key) is cacheable. Least recently used entries are evicted
+        if cache is full.
+
+        :param key: request key
+        :param value: parsed response
+        """
+        ttl = self.ttl.get(key[0])
+        if not ttl:
+            return
+        with self.__lock:
+            self.__entries[key] = (time.monotonic() + ttl, value)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+                self.__evictions += 1
+
+    def invalidate(self, operation: Optional[str] = None):
+        """
+        Remove entries of operation or all entries
+
+        :param operation: operation name (ex: 'fetch-markets'). If not defined - whole cache is cleared
+        """
+        with self.__lock:
+            if operation is None:
+                self.__entries.clear()
+                return
+            for key in [key for key in self.__entries if key[0] == operation]:
+                del self.__entries[key]
+
+    def stats(self) -> CacheStats:
+        """
+        Snapshot of the cache usage
+        """
+        with self.__lock:
+            return CacheStats(hits=self.__hits,
+                              misses=self.__misses,
+                              evictions=self.__evictions,
+                              size=len(self.__entries))
@@ -1,14 +1,211 @@
-import json
-import hmac
+import time
 
-from datetime import datetime
-from typing import List, Iterator, Optional, Tuple
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from functools import partial
+from itertools import islice
+from typing import List, Iterator, Optional, Tuple, Callable, Iterable, TypeVar, Any
 
 import requests
 
 from aiohttp import ClientResponse
 
-from .models import Ticker, Resolution, NewOrder, Order, Symbol, Depth, Trade, Account, Ticker24, VolumeFee
+from .cache import ResponseCache, request_key
+from .codec import JSONCodec
+from .columnar import TickerColumns, DepthColumns
+from .lazy import EAGER_MODELS, LAZY_MODELS
+from .hooks import Hooks, RequestInfo
+from .metrics import Metrics
+from .profiler import SamplingProfiler
+from .ratelimit import RateLimiter
+from .signing import Signer
+from .streaming import iter_json_array, STREAM_CHUNK_SIZE
+from .retry import RetryPolicy, IDEMPOTENT_OPERATIONS
+from .transport import TransportConfig
+from .models import Ticker, Resolution, NewOrder, Order, Symbol, Depth, Trade, Account, Ticker24, VolumeFee, \
+    Markets, MarketsChanges, OrderResult
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+def _encode_json(codec: JSONCodec, kwargs: dict) -> dict:
+    """
+    Replace `json` request parameter by body encoded by codec
+    """
+    if 'json' not in kwargs:
+        return kwargs
+    kwargs = dict(kwargs)
+    kwargs['data'] = codec.dumps(kwargs.pop('json'))
+    kwargs['headers'] = dict(kwargs.get('headers') or {}, **{'Content-Type': 'application/json'})
+    return kwargs
+
+
+def _klines_request(symbol: str, utc_start_time: datetime, utc_end_time: datetime, resolution: Resolution,
+                    limit: int) -> dict:
+    return {
+        'req': {
+            'startTime': int(utc_start_time.timestamp() * 1000),
+            'endTime': int(utc_end_time.timestamp() * 1000),
+            'symbolName': symbol,
+            'resolution': resolution.value,
+            'limit': limit,
+        }
+    }
+
+
+def _history_request(begin: datetime, end: datetime, currency: str) -> dict:
+    return {
+        "req": {
+            "currency": currency,
+            "fromTimestamp": int(begin.timestamp()),
+            "toTimestamp": int(end.timestamp())
+        }
+    }
+
+
+def _time_windows(begin: datetime, end: datetime, step: timedelta) -> Iterator[Tuple[datetime, datetime]]:
+    """
+    Split [begin, end] into consecutive windows no longer than `step`. Neighbour windows share the boundary.
+    """
+    while True:
+        until = min(begin + step, end)
+        yield begin, until
+        if until >= end:
+            return
+        begin = until
+
+
+def _newer(records: List[T], last: Any, key: Callable[[T], Any]) -> List[T]:
+    """
+    Sort records of a window by `key` and drop ones not after `last` (duplicates of the previous window boundary)
+    """
+    records = sorted(records, key=key)
+    if last is None:
+        return records
+    return [record for record in records if key(record) > last]
+
+
+def _parse_markets(data: dict) -> Markets:
+    return Markets(Symbol.from_json(info) for info in (data['symbol'] or []))
+
+
+def _parse_tickers24(data: dict) -> List[Ticker24]:
+    return [Ticker24.from_json(info) for info in data['ohlc']]
+
+
+def _parse_ohlcv(data: dict, model: type = Ticker) -> List[Ticker]:
+    return [model.from_json(info) for info in (data['ohlc'] or [])]
+
+
+def _parse_trades(data: dict, model: type = Trade) -> List[Trade]:
+    return [model.from_json(info) for info in (data['trades'] or [])]
+
+
+def _parse_history(data: list, model: type = Ticker) -> List[Ticker]:
+    return [model.from_json_history(info) for info in data]
+
+
+def _parse_orders(data: dict, model: type = Order) -> List[Order]:
+    return [model.from_json(info) for info in (data['orders'] or [])]
+
+
+def _parse_accounts(data: dict) -> List[Account]:
+    return [Account.from_json(info) for info in (data['accounts'] or [])]
+
+
+def _parse_volume_fees(data: dict) -> List[VolumeFee]:
+    return [VolumeFee.from_json(record) for record in data['fees']]
+
+
+def _fan_out(executor: Optional[Executor], items: Iterable[T], fetch: Callable[[T], R],
+             window: int = 1) -> Iterator[R]:
+    """
+    Run `fetch` for each item in the executor and yield results in items order.
+
+    No more than `window` calls are submitted ahead of the consumer, so the iterator stays lazy.
+    Without executor items are fetched one by one in the caller thread.
+    Not started calls are cancelled if the consumer stops iteration early.
+
+    :param executor: thread pool executor or None for sequential mode
+    :param items: arguments for `fetch`
+    :param fetch: function invoked once per item
+    :param window: maximum number of submitted and not yet consumed calls
+    :return: iterator of results
+    """
+    if executor is None or window <= 1:
+        for item in items:
+            yield fetch(item)
+        return
+    items = iter(items)
+    pending = deque(executor.submit(fetch, item) for item in islice(items, window))
+    try:
+        while pending:
+            result = pending.popleft().result()
+            pending.extend(executor.submit(fetch, item) for item in islice(items, 1))
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _fan_out_threads(items: Iterable[T], fetch: Callable[[T], R], concurrency: int = 1) -> Iterator[R]:
+    """
+    Same as `_fan_out` but with a temporary pool of `concurrency` threads (sequential mode if 1 or less)
+    """
+    if concurrency <= 1:
+        yield from _fan_out(None, items, fetch)
+        return
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='crix')
+    try:
+        yield from _fan_out(executor, items, fetch, concurrency)
+    finally:
+        executor.shutdown(wait=False)
+
+
+def _payload_size(kwargs: dict) -> int:
+    return len(kwargs.get('data') or b'')
+
+
+def _observe(info: RequestInfo, metrics: Optional[Metrics], hooks: Optional[Hooks],
+             profiler: Optional[SamplingProfiler]):
+    """
+    Report completed request to metrics, profiler (if the call is sampled) and `after_response` hook
+    """
+    if metrics is not None:
+        metrics.record(info.operation, info.network, info.decode, info.parse, info.payload_size,
+                       info.response_size or 0)
+    if profiler is not None:
+        for phase, seconds in (('network', info.network), ('decode', info.decode), ('parse', info.parse)):
+            if seconds is not None:
+                profiler.record(info.operation, phase, seconds)
+    if hooks is not None and hooks.after_response is not None:
+        hooks.after_response(info)
+
+
+def _failed(info: RequestInfo, err: Exception, metrics: Optional[Metrics], hooks: Optional[Hooks]):
+    """
+    Report failed attempt to metrics and `on_error` hook
+    """
+    if metrics is not None:
+        metrics.record_error(info.operation, info.status or 0)
+    if hooks is not None and hooks.on_error is not None:
+        hooks.on_error(info, err)
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
 
 
 class APIError(RuntimeError):
@@ -19,11 +216,13 @@ class APIError(RuntimeError):
     operation: str  #: operation name
     code: int  #: HTTP response code
     text: str  #: error description
+    retry_after: Optional[float]  #: delay in seconds requested by server (Retry-After header)
 
-    def __init__(self, operation: str, code: int, text: str) -> None:
+    def __init__(self, operation: str, code: int, text: str, retry_after: Optional[float] = None) -> None:
         self.code = code
         self.operation = operation
         self.text = text
+        self.retry_after = retry_after
         super().__init__('API ({}) error: code {}: {}'.format(operation, code, text))
 
     @staticmethod
@@ -35,7 +234,8 @@ class APIError(RuntimeError):
         :param req: request's response object
         """
         if req.status_code not in (200, 204):
-            raise APIError(operation, req.status_code, req.text)
+            raise APIError(operation, req.status_code, req.text,
+                           _parse_retry_after(req.headers.get('Retry-After')))
 
     @staticmethod
     async def async_ensure(operation: str, req: ClientResponse):
@@ -47,7 +247,7 @@ class APIError(RuntimeError):
         """
         if req.status not in (200, 204):
             text = await req.text()
-            raise APIError(operation, req.status, text)
+            raise APIError(operation, req.status, text, _parse_retry_after(req.headers.get('Retry-After')))
 
 
 class Client:
@@ -59,10 +259,32 @@ class Client:
     - 'mvp' - testnet sandbox with full-wipe each 2nd week (usually)
     - 'prod' - mainnet, production environment with real currency
 
-    Disable `cache_market` if latest symbols info are always required
+    Disable `cache_market` if latest symbols info are always required. Symbols added, removed or changed
+    by the latest markets refresh are available in `market_changes`.
+
+    Connection pool could be tuned by `transport` or shared with other clients by `session`.
+
+    Requests are paced by `rate_limiter` if provided. Read-only operations are repeated on transient errors
+    according to `retry` policy if provided. Responses of public read-only operations are kept in `cache`
+    if provided (with `cache` markets expire by TTL instead of `cache_market`).
+
+    Requests are encoded and responses are decoded by `codec` (by default - standard library `json`).
+
+    Enable `lazy_models` to get tickers, offers, orders and trades as raw-backed objects
+    (see :mod:`crix.lazy`) which convert fields on first access.
+
+    Per-operation request counts, errors, latency and bytes are collected to `metrics` if provided
+    (see :mod:`crix.metrics`). Requests could be traced by `hooks` (see :mod:`crix.hooks`) and
+    sampled by `profiler` (see :mod:`crix.profiler`).
+
+    Client could be used as a context manager which calls `close` on exit.
     """
 
-    def __init__(self, *, env: str = 'mvp', cache_market: bool = True):
+    def __init__(self, *, env: str = 'mvp', cache_market: bool = True, session: Optional[requests.Session] = None,
+                 transport: Optional[TransportConfig] = None, rate_limiter: Optional[RateLimiter] = None,
+                 retry: Optional[RetryPolicy] = None, cache: Optional[ResponseCache] = None,
+                 codec: Optional[JSONCodec] = None, lazy_models: bool = False, metrics: Optional[Metrics] = None,
+                 hooks: Optional[Hooks] = None, profiler: Optional[SamplingProfiler] = None):
         self.environment = env
         if env == 'prod':
             self._base_url = 'https://crix.io'
@@ -70,8 +292,33 @@ class Client:
             self._base_url = 'https://{}.crix.io'.format(env)
         self._base_url += '/api/v1'
         self.__cache_market = cache_market
-        self.__market_cache = None
-        self._session = requests.Session()
+        self.__market_cache: Optional[Markets] = None
+        self.market_changes = MarketsChanges(added=(), removed=(), changed=())
+        self.__own_session = session is None
+        if session is None:
+            session = transport.session() if transport is not None else requests.Session()
+        self._session = session
+        self._rate_limiter = rate_limiter
+        self._retry = retry
+        self._cache = cache
+        self._codec = codec or JSONCodec()
+        self._models = LAZY_MODELS if lazy_models else EAGER_MODELS
+        self._metrics = metrics
+        self._hooks = hooks
+        self._profiler = profiler
+
+    def close(self):
+        """
+        Release connections of the session created by the client (provided `session` is left open)
+        """
+        if self.__own_session:
+            self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def fetch_currency_codes(self) -> List[str]:
         """
@@ -79,25 +326,28 @@ class Client:
 
         :return: list of formatted currencies codes
         """
-        return [(sym.base + "_" + sym.quote).lower() for sym in self.fetch_markets()]
+        return list(self.fetch_markets().currency_codes)
 
-    def fetch_markets(self, force: bool = False) -> Tuple[Symbol]:
+    def fetch_markets(self, force: bool = False) -> Markets:
         """
         Get list of all symbols on the exchange. Also includes symbol details like precision, quote, base and e.t.c.
         It's a good idea to cache result of this function after first invoke
 
         :param force: don't use cached symbols
-        :return: list of supported symbols
-        """
-        if not self.__cache_market or force or self.__market_cache is None:
-            symbols = []
-            req = self._session.get(self._base_url + '/info/symbols')
-            APIError.ensure('fetch-markets', req)
-            data = req.json()
-            for info in (data['symbol'] or []):
-                symbols.append(Symbol.from_json(info))
-            self.__market_cache = tuple(symbols)
-        return self.__market_cache
+        :return: list of supported symbols indexed by name, base and quote currency
+        """
+        if self._cache is not None:
+            if force:
+                self._cache.invalidate('fetch-markets')
+            markets = self._request('fetch-markets', 'GET', '/info/symbols', parse=_parse_markets)
+        elif not self.__cache_market or force or self.__market_cache is None:
+            markets = self._request('fetch-markets', 'GET', '/info/symbols', parse=_parse_markets)
+        else:
+            return self.__market_cache
+        if markets is not self.__market_cache:
+            self.market_changes = markets.diff(self.__market_cache)
+            self.__market_cache = markets
+        return markets
 
     def fetch_order_book(self, symbol: str, level_aggregation: Optional[str] = None) -> Depth:
         """
@@ -127,11 +377,25 @@ class Client:
         }
         if level_aggregation is not None:
             req['strLevelAggregation'] = level_aggregation
-        req = self._session.post(self._base_url + '/depths', json={
+        return self._request('fetch-order-book', 'POST', '/depths', json={
             'req': req
-        })
-        APIError.ensure('fetch-order-book', req)
-        return Depth.from_json(req.json())
+        }, parse=partial(Depth.from_json, offer=self._models.offer))
+
+    def fetch_order_book_columns(self, symbol: str, level_aggregation: Optional[str] = None) -> DepthColumns:
+        """
+        Same as `fetch_order_book` but returns array-backed order book with fast queries (requires numpy).
+
+        :param symbol: interesting symbol name
+        :param level_aggregation: aggregate by rounding numbers (if not defined - no aggregation)
+        :return: order depth book columns
+        """
+        req = {
+            'symbolName': symbol
+        }
+        if level_aggregation is not None:
+            req['strLevelAggregation'] = level_aggregation
+        return self._request('fetch-order-book-columns', 'POST', '/depths', json={'req': req},
+                             parse=DepthColumns.from_json)
 
     def fetch_ticker(self) -> List[Ticker24]:
         """
@@ -139,13 +403,7 @@ class Client:
 
         :return: list of tickers
         """
-        tickers = []
-        req = self._session.get(self._base_url + '/tickers24')
-        APIError.ensure('ticker', req)
-        data = req.json()
-        for info in data['ohlc']:
-            tickers.append(Ticker24.from_json(info))
-        return tickers
+        return self._request('ticker', 'GET', '/tickers24', parse=_parse_tickers24)
 
     def fetch_ohlcv(self, symbol: str, utc_start_time: datetime, utc_end_time: datetime,
                     resolution: Resolution = Resolution.one_minute,
@@ -163,21 +421,73 @@ class Client:
         :param limit: maximum number of entries in a response
         :return: list of ticker
         """
-        tickers = []
-        req = self._session.post(self._base_url + '/klines', json={
-            'req': {
-                'startTime': int(utc_start_time.timestamp() * 1000),
-                'endTime': int(utc_end_time.timestamp() * 1000),
-                'symbolName': symbol,
-                'resolution': resolution.value,
-                'limit': limit,
-            }
-        })
-        APIError.ensure('fetch-ohlcv', req)
-        data = req.json()
-        for info in (data['ohlc'] or []):
-            tickers.append(Ticker.from_json(info))
-        return tickers
+        # the latest candle is still open and could change
+        closed = utc_end_time.timestamp() + resolution.interval.total_seconds() <= time.time()
+        return self._request('fetch-ohlcv', 'POST', '/klines',
+                             json=_klines_request(symbol, utc_start_time, utc_end_time, resolution, limit),
+                             parse=partial(_parse_ohlcv, model=self._models.ticker), cache=closed)
+
+    def fetch_ohlcv_range(self, symbol: str, utc_start_time: datetime, utc_end_time: datetime,
+                          resolution: Resolution = Resolution.one_minute, limit: int = 1000,
+                          concurrency: int = 1) -> Iterator[Ticker]:
+        """
+        Get K-Lines for specific symbol in a time frame of any length.
+
+        The time frame is split into windows of `limit` K-lines which are fetched by `fetch_ohlcv`
+        (up to `concurrency` windows in parallel by a thread pool). K-lines are yielded in time order
+        without duplicates on windows boundaries as soon as their window arrives.
+
+        .. highlight:: python
+        .. code-block:: python
+
+            from datetime import datetime
+            import crix
+
+            client = crix.Client(env='mvp')
+            candles = list(client.fetch_ohlcv_range('BTC_USDT', datetime(2019, 1, 1), datetime(2019, 2, 1),
+                                                    concurrency=4))
+
+        :param symbol: K-Line symbol name
+        :param utc_start_time: earliest interesting time
+        :param utc_end_time: latest interesting time
+        :param resolution: K-line resolution (by default 1-minute)
+        :param limit: maximum number of entries in a response per window (at least 2)
+        :param concurrency: maximum number of windows fetched simultaneously
+        :return: iterator of tickers
+        """
+        # both window boundaries are inclusive, so window has limit - 1 intervals
+        windows = _time_windows(utc_start_time, utc_end_time, resolution.interval * (max(limit, 2) - 1))
+
+        def fetch(window: Tuple[datetime, datetime]) -> List[Ticker]:
+            return self.fetch_ohlcv(symbol, window[0], window[1], resolution, limit)
+
+        last = None
+        for candles in _fan_out_threads(windows, fetch, concurrency):
+            candles = _newer(candles, last, lambda candle: candle.open_time)
+            if candles:
+                last = candles[-1].open_time
+            yield from candles
+
+    def fetch_ohlcv_columns(self, symbol: str, utc_start_time: datetime, utc_end_time: datetime,
+                            resolution: Resolution = Resolution.one_minute,
+                            limit: int = 10, scale: Optional[int] = None) -> TickerColumns:
+        """
+        Same as `fetch_ohlcv` but returns columnar result: numpy arrays of times and prices (requires numpy).
+
+        :param symbol: K-Line symbol name
+        :param utc_start_time: earliest interesting time
+        :param utc_end_time: latest interesting time
+        :param resolution: K-line resolution (by default 1-minute)
+        :param limit: maximum number of entries in a response
+        :param scale: store prices and volume as int64 with the number of decimal digits (None - float64)
+        :return: K-lines columns
+        """
+        closed = utc_end_time.timestamp() + resolution.interval.total_seconds() <= time.time()
+        return self._request('fetch-ohlcv-columns', 'POST', '/klines',
+                             json=_klines_request(symbol, utc_start_time, utc_end_time, resolution, limit),
+                             parse=lambda data: TickerColumns.from_json(data['ohlc'] or [], symbol,
+                                                                        resolution.value, scale),
+                             cache=closed)
 
     def fetch_trades(self, symbol: str, limit: int = 100) -> List[Trade]:
         """
@@ -187,18 +497,12 @@ class Client:
         :param limit: maximum number of trades (could not be more then 1000)
         :return: list of trades
         """
-        req = self._session.post(self._base_url + '/trades', json={
+        return self._request('fetch-trades', 'POST', '/trades', json={
             'req': {
                 'symbolName': symbol,
                 'limit': limit,
             }
-        })
-        APIError.ensure('fetch-trades', req)
-        data = req.json()
-        trades = []
-        for info in (data['trades'] or []):
-            trades.append(Trade.from_json(info))
-        return trades
+        }, parse=partial(_parse_trades, model=self._models.trade))
 
     def fetch_volume_fees(self, symbol: str) -> List[VolumeFee]:
         """
@@ -207,14 +511,117 @@ class Client:
         :param symbol: symbol name
         :return: list of volume fee
         """
-        req = self._session.post(self._base_url + '/info/fee/volume', json={
+        return self._request('fetch-volume-fees', 'POST', '/info/fee/volume', json={
             'req': {
                 'symbolName': symbol,
             }
-        })
-        APIError.ensure('fetch-volume-fees', req)
-        data = req.json()
-        return [VolumeFee.from_json(record) for record in data['fees']]
+        }, parse=_parse_volume_fees)
+
+    def _request(self, operation: str, method: str, path: str, parse: Optional[Callable[[dict], R]] = None,
+                 cache: bool = True, profiled: Optional[bool] = None, **kwargs) -> R:
+        """
+        Make request to the API endpoint and decode response
+
+        :param operation: logical operation name
+        :param method: HTTP method
+        :param path: API path relative to the base URL (ex: '/depths')
+        :param parse: function to build result from decoded JSON (if not defined - decoded JSON returned as-is)
+        :param cache: allow to use response cache for the request
+        :param profiled: record phases of the call to the profiler (if not defined - sampled by the profiler)
+        :param kwargs: additional parameters for the session request
+        :return: decoded JSON response or parsed result
+        """
+        key = None
+        if cache and self._cache is not None and operation in self._cache.ttl:
+            key = request_key(operation, method, self._base_url + path, kwargs)
+            found, value = self._cache.get(key)
+            if found:
+                return value
+        kwargs = _encode_json(self._codec, kwargs)
+        if profiled is None:
+            profiled = self._profiler is not None and self._profiler.sample()
+        if self._metrics is None and self._hooks is None and not profiled:
+            data = self._codec.loads(self._send(operation, method, path, kwargs)[0].content)
+            if parse is not None:
+                data = parse(data)
+        else:
+            req, attempt, sent = self._send(operation, method, path, kwargs)
+            received = time.perf_counter()
+            data = self._codec.loads(req.content)
+            decoded = time.perf_counter()
+            if parse is not None:
+                data = parse(data)
+            info = RequestInfo(operation=operation, method=method, url=self._base_url + path,
+                               payload_size=_payload_size(kwargs), attempt=attempt, status=req.status_code,
+                               response_size=len(req.content), network=received - sent,
+                               decode=decoded - received, parse=time.perf_counter() - decoded)
+            _observe(info, self._metrics, self._hooks, self._profiler if profiled else None)
+        if key is not None:
+            self._cache.put(key, data)
+        return data
+
+    def _stream(self, operation: str, method: str, path: str, key: Optional[str] = None, **kwargs) -> Iterator[Any]:
+        """
+        Make request to the API endpoint and decode elements of JSON array in response as they arrive
+
+        :param operation: logical operation name
+        :param method: HTTP method
+        :param path: API path relative to the base URL (ex: '/depths')
+        :param key: field of the response object with the array (None - response is the array)
+        :param kwargs: additional parameters for the session request
+        :return: iterator of decoded array elements
+        """
+        kwargs = _encode_json(self._codec, kwargs)
+        req, attempt, _ = self._send(operation, method, path, kwargs, stream=True)
+        with req:
+            if self._metrics is not None or self._hooks is not None:
+                info = RequestInfo(operation=operation, method=method, url=self._base_url + path,
+                                   payload_size=_payload_size(kwargs), attempt=attempt, status=req.status_code)
+                _observe(info, self._metrics, self._hooks, None)
+            yield from iter_json_array(req.iter_content(STREAM_CHUNK_SIZE), key)
+
+    def _send(self, operation: str, method: str, path: str, kwargs: dict,
+              stream: bool = False) -> Tuple[requests.Response, int, float]:
+        """
+        Send request with rate limiting and retries and check response status
+
+        :param operation: logical operation name
+        :param method: HTTP method
+        :param path: API path relative to the base URL
+        :param kwargs: encoded parameters for the session request
+        :param stream: don't read response body
+        :return: successful response, number of made attempts and start time of the successful attempt
+                 (`time.perf_counter`, after rate limiter wait)
+        """
+        retry = self._retry if operation in IDEMPOTENT_OPERATIONS else None
+        url = self._base_url + path
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            sent = 0.0
+            try:
+                if self._rate_limiter is not None:
+                    self._rate_limiter.acquire(path)
+                if self._hooks is not None and self._hooks.before_request is not None:
+                    self._hooks.before_request(RequestInfo(operation=operation, method=method, url=url,
+                                                           payload_size=_payload_size(kwargs), attempt=attempt))
+                sent = time.perf_counter()
+                req = self._session.request(method, url, stream=stream, **kwargs)
+                APIError.ensure(operation, req)
+                return req, attempt, sent
+            except (APIError, requests.ConnectionError, requests.Timeout) as err:
+                if self._metrics is not None or self._hooks is not None:
+                    info = RequestInfo(operation=operation, method=method, url=url, payload_size=_payload_size(kwargs),
+                                       attempt=attempt, status=getattr(err, 'code', None),
+                                       network=time.perf_counter() - sent if sent else None)
+                    _failed(info, err, self._metrics, self._hooks)
+                if retry is None or (isinstance(err, APIError) and err.code not in retry.statuses):
+                    raise
+                delay = retry.delay(attempt, time.monotonic() - started, getattr(err, 'retry_after', None))
+                if delay is None:
+                    raise
+                time.sleep(delay)
 
 
 class AuthorizedClient(Client):
@@ -228,12 +635,37 @@ class AuthorizedClient(Client):
 
     Expects API token and API secret provided by CRIX.IO exchange as
     part of bot API.
+
+    Set `workers` to make per-symbol requests (fetch_open_orders, fetch_closed_orders, fetch_orders,
+    fetch_my_trades) and windows of fetch_history in parallel by a thread pool. Connection pool of the session
+    is enlarged to the same size unless `session` or `transport` provided. The pool is stopped by `close`.
     """
 
-    def __init__(self, token: str, secret: str, *, env: str = 'mvp', cache_market: bool = True):
-        super().__init__(env=env, cache_market=cache_market)
-        self.__token = token
-        self.__secret = secret
+    def __init__(self, token: str, secret: str, *, env: str = 'mvp', cache_market: bool = True, workers: int = 0,
+                 session: Optional[requests.Session] = None, transport: Optional[TransportConfig] = None,
+                 rate_limiter: Optional[RateLimiter] = None, retry: Optional[RetryPolicy] = None,
+                 cache: Optional[ResponseCache] = None, codec: Optional[JSONCodec] = None,
+                 lazy_models: bool = False, metrics: Optional[Metrics] = None, hooks: Optional[Hooks] = None,
+                 profiler: Optional[SamplingProfiler] = None):
+        if workers > 1 and session is None and transport is None:
+            transport = TransportConfig(pool_per_host=workers)
+        super().__init__(env=env, cache_market=cache_market, session=session, transport=transport,
+                         rate_limiter=rate_limiter, retry=retry, cache=cache, codec=codec,
+                         lazy_models=lazy_models, metrics=metrics, hooks=hooks, profiler=profiler)
+        self.__signer = Signer(token, secret)
+        self._workers = workers
+        self._executor = None
+        if workers > 1:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='crix')
+
+    def close(self):
+        """
+        Stop worker threads and release connections of the session created by the client
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        super().close()
 
     def fetch_open_orders(self, *symbols: str, limit: int = 1000) -> Iterator[Order]:
         """
@@ -242,7 +674,7 @@ class AuthorizedClient(Client):
         .. note::
             One request per each symbol will be made plus additional
             request to query all supported symbols if symbols parameter
-            not specified.
+            not specified. Requests are made in parallel if client has `workers`.
 
 
         :param symbols: filter orders by symbols. if not specified - all symbols queried and used
@@ -250,16 +682,13 @@ class AuthorizedClient(Client):
         :return: iterator of orders definitions
         """
         if not symbols:
-            symbols = [sym.name for sym in self.fetch_markets()]
-        for symbol in symbols:
-            response = self.__signed_request('fetch-open-orders', self._base_url + '/user/orders/open', {
-                'req': {
-                    'limit': limit,
-                    'symbolName': symbol
-                }
-            })
-            for info in (response['orders'] or []):
-                yield Order.from_json(info)
+            symbols = self.fetch_markets().names
+
+        def fetch(symbol: str) -> List[Order]:
+            return self.__fetch_orders('fetch-open-orders', '/user/orders/open', symbol, limit)
+
+        for orders in _fan_out(self._executor, symbols, fetch, self._workers):
+            yield from orders
 
     def fetch_closed_orders(self, *symbols: str, limit: int = 1000) -> Iterator[Order]:
         """
@@ -268,23 +697,20 @@ class AuthorizedClient(Client):
         .. note::
             One request per each symbol will be made plus additional
             request to query all supported symbols if symbols parameter
-            not specified.
+            not specified. Requests are made in parallel if client has `workers`.
 
         :param symbols: filter orders by symbols. if not specified - all symbols queried and used
         :param limit: maximum number of orders for each symbol
         :return: iterator of orders definitions
         """
         if not symbols:
-            symbols = [sym.name for sym in self.fetch_markets()]
-        for symbol in symbols:
-            response = self.__signed_request('fetch-closed-orders', self._base_url + '/user/orders/complete', {
-                'req': {
-                    'limit': limit,
-                    'symbolName': symbol
-                }
-            })
-            for info in (response['orders'] or []):
-                yield Order.from_json(info)
+            symbols = self.fetch_markets().names
+
+        def fetch(symbol: str) -> List[Order]:
+            return self.__fetch_orders('fetch-closed-orders', '/user/orders/complete', symbol, limit)
+
+        for orders in _fan_out(self._executor, symbols, fetch, self._workers):
+            yield from orders
 
     def fetch_orders(self, *symbols: str, limit: int = 1000) -> Iterator[Order]:
         """
@@ -294,21 +720,27 @@ class AuthorizedClient(Client):
         .. note::
             Two requests per each symbol will be made plus additional
             request to query all supported symbols if symbols parameter
-            not specified.
+            not specified. Requests are made in parallel if client has `workers`.
 
         :param symbols: symbols: filter orders by symbols. if not specified - used all symbols
         :param limit: maximum number of orders for each symbol for each state (open, close)
         :return: iterator of orders definitions sorted from open to close
         """
         if not symbols:
-            symbols = [sym.name for sym in self.fetch_markets()]
+            symbols = self.fetch_markets().names
+        pages = []
         for symbol in symbols:
-            for order in self.fetch_open_orders(symbol, limit=limit):
-                yield order
-            for order in self.fetch_closed_orders(symbol, limit=limit):
-                yield order
+            pages.append(('fetch-open-orders', '/user/orders/open', symbol))
+            pages.append(('fetch-closed-orders', '/user/orders/complete', symbol))
 
-    def fetch_my_trades(self, *symbols: str, limit: int = 1000) -> Iterator[Trade]:
+        def fetch(page: Tuple[str, str, str]) -> List[Order]:
+            operation, path, symbol = page
+            return self.__fetch_orders(operation, path, symbol, limit)
+
+        for orders in _fan_out(self._executor, pages, fetch, self._workers):
+            yield from orders
+
+    def fetch_my_trades(self, *symbols: str, limit: int = 1000, stream: bool = False) -> Iterator[Trade]:
         """
         Get all trades for the user. There is some gap (a few ms) between time when trade is actually created and time
         when it becomes visible for the user.
@@ -316,23 +748,38 @@ class AuthorizedClient(Client):
         .. note::
             One request per each symbol will be made plus additional
             request to query all supported symbols if symbols parameter
-            not specified.
+            not specified. Requests are made in parallel if client has `workers`.
 
         :param symbols: filter trades by symbols. if not specified - used all symbols
         :param limit: maximum number of trades for each symbol
+        :param stream: decode responses incrementally and yield trades while they are being received
+                       (symbols are requested one by one)
         :return: iterator of trade definition
         """
         if not symbols:
-            symbols = [sym.name for sym in self.fetch_markets()]
-        for symbol in symbols:
-            response = self.__signed_request('fetch-my-trades', self._base_url + '/user/trades', {
+            symbols = self.fetch_markets().names
+
+        if stream:
+            for symbol in symbols:
+                for info in self.__signed_stream('fetch-my-trades', '/user/trades', {
+                    'req': {
+                        'limit': limit,
+                        'symbolName': symbol
+                    }
+                }, key='trades'):
+                    yield self._models.trade.from_json(info)
+            return
+
+        def fetch(symbol: str) -> List[Trade]:
+            return self.__signed_request('fetch-my-trades', '/user/trades', {
                 'req': {
                     'limit': limit,
                     'symbolName': symbol
                 }
-            })
-            for info in (response['trades'] or []):
-                yield Trade.from_json(info)
+            }, parse=partial(_parse_trades, model=self._models.trade))
+
+        for trades in _fan_out(self._executor, symbols, fetch, self._workers):
+            yield from trades
 
     def fetch_balance(self) -> List[Account]:
         """
@@ -340,8 +787,7 @@ class AuthorizedClient(Client):
 
         :return: list of all accounts
         """
-        response = self.__signed_request('fetch-balance', self._base_url + '/user/accounts', {})
-        return [Account.from_json(info) for info in (response['accounts'] or [])]
+        return self.__signed_request('fetch-balance', '/user/accounts', {}, parse=_parse_accounts)
 
     def cancel_order(self, order_id: int, symbol: str) -> Order:
         """
@@ -351,13 +797,47 @@ class AuthorizedClient(Client):
         :param symbol: symbol names same as in placed order
         :return: order definition with filled field (also includes filled quantity)
         """
-        response = self.__signed_request('cancel-order', self._base_url + '/user/order/cancel', {
+        return self.__signed_request('cancel-order', '/user/order/cancel', {
             'req': {
                 'orderId': order_id,
                 'symbolName': symbol,
             }
-        })
-        return Order.from_json(response)
+        }, parse=self._models.order.from_json)
+
+    def cancel_all(self, *symbols: str, concurrency: int = 1) -> List[OrderResult]:
+        """
+        Cancel all open orders of the user with up to `concurrency` cancel requests at the same time
+        (by a thread pool). Open orders are scanned by one request per symbol (in parallel if client has
+        `workers`) and cancelled as soon as they are found, so the scan and the cancellation overlap.
+        Failure of one scan or one cancel doesn't abort others.
+
+        :param symbols: cancel orders only of the symbols. if not specified - used all symbols
+        :param concurrency: maximum number of simultaneous cancel requests
+        :return: results of cancellation in order of the scan followed by failed scans
+                 (result with symbol name as `request`)
+        """
+        if not symbols:
+            symbols = self.fetch_markets().names
+        failures = []
+
+        def scan(symbol: str) -> List[Order]:
+            try:
+                return self.__fetch_orders('fetch-open-orders', '/user/orders/open', symbol, 1000)
+            except (APIError, requests.RequestException) as err:
+                failures.append(OrderResult(request=symbol, order=None, error=err))
+                return []
+
+        def found() -> Iterator[Order]:
+            for orders in _fan_out(self._executor, symbols, scan, self._workers):
+                yield from orders
+
+        def cancel(order: Order) -> OrderResult:
+            try:
+                return OrderResult(request=order, order=self.cancel_order(order.id, order.symbol_name), error=None)
+            except (APIError, requests.RequestException) as err:
+                return OrderResult(request=order, order=None, error=err)
+
+        return list(_fan_out_threads(found(), cancel, concurrency)) + failures
 
     def create_order(self, new_order: NewOrder) -> Order:
         """
@@ -366,10 +846,35 @@ class AuthorizedClient(Client):
         :param new_order: order parameters
         :return: order definition with filled fields from the exchange
         """
-        response = self.__signed_request('create-order', self._base_url + '/user/order/create', {
+        return self.__signed_request('create-order', '/user/order/create', {
             "req": new_order.to_json()
-        })
-        return Order.from_json(response)
+        }, parse=self._models.order.from_json)
+
+    def create_orders(self, new_orders: Iterable[NewOrder], concurrency: int = 1) -> List[OrderResult]:
+        """
+        Create and place several orders with up to `concurrency` requests at the same time (by a thread pool).
+        Failure of one order doesn't abort the batch.
+
+        .. highlight:: python
+        .. code-block:: python
+
+            ladder = [NewOrder.limit('BTC_USDT', is_buy=True, price=3500 - step, quantity='0.1') for step in range(50)]
+            for result in client.create_orders(ladder, concurrency=10):
+                if not result.ok:
+                    print(result.request.price, result.error)
+
+        :param new_orders: orders parameters
+        :param concurrency: maximum number of simultaneous requests
+        :return: results in the same order as new orders
+        """
+
+        def place(new_order: NewOrder) -> OrderResult:
+            try:
+                return OrderResult(request=new_order, order=self.create_order(new_order), error=None)
+            except (APIError, requests.RequestException) as err:
+                return OrderResult(request=new_order, order=None, error=err)
+
+        return list(_fan_out_threads(new_orders, place, concurrency))
 
     def fetch_order(self, order_id: int, symbol_name: str) -> Optional[Order]:
         """
@@ -380,19 +885,19 @@ class AuthorizedClient(Client):
         :return: order definition or None if nothing found
         """
         try:
-            response = self.__signed_request('fetch-order', self._base_url + '/user/order/info', {
+            return self.__signed_request('fetch-order', '/user/order/info', {
                 "req": {
                     "orderId": order_id,
                     "symbolName": symbol_name
                 }
-            })
+            }, parse=self._models.order.from_json)
         except APIError as err:
             if 'not found' in err.text:
                 return None
             raise
-        return Order.from_json(response)
 
-    def fetch_history(self, begin: datetime, end: datetime, currency: str) -> Iterator[Ticker]:
+    def fetch_history(self, begin: datetime, end: datetime, currency: str,
+                      window: Optional[timedelta] = None, stream: bool = False) -> Iterator[Ticker]:
         """
         Get historical minute tickers for specified time range and currency
         There are several caveats:
@@ -400,33 +905,80 @@ class AuthorizedClient(Client):
         - it requires additional permission
         - end param should be not more then server time, otherwise error returned
         - maximum difference between earliest and latest date should be no more then 366 days
-        - it could be slow for a long time range
+        - it could be slow for a long time range (use `window` to split it)
         - mostly all points have 1 minute tick however in a very few cases gap can be a bit bigger
 
         :param begin: earliest interesting time
         :param end: latest interesting time
         :param currency: currency name in upper case
+        :param window: request time range by windows of the duration (in parallel if client has `workers`)
+                       to get first tickers earlier and keep memory usage bounded
+        :param stream: decode response incrementally and yield tickers while it is being received
+                       (only without `window`)
         :return: iterator of parsed tickers
+        :raise ValueError: window is shorter than one second or both window and stream are set
+        """
+        if window is not None and window < timedelta(seconds=1):
+            # time range is requested with precision of seconds
+            raise ValueError('window should be at least one second, got {}'.format(window))
+        if window is not None and stream:
+            raise ValueError('stream is not supported with window')
+        if window is None and stream:
+            for info in self.__signed_stream('fetch-history', '/user/rates/history',
+                                             _history_request(begin, end, currency)):
+                yield self._models.ticker.from_json_history(info)
+            return
+        # same parsing for all requests of the operation: responses could be shared by cache or coalescing
+        parse = partial(_parse_history, model=self._models.ticker)
+        if window is None:
+            yield from self.__signed_request('fetch-history', '/user/rates/history',
+                                             _history_request(begin, end, currency), parse=parse)
+            return
+
+        def fetch(part: Tuple[datetime, datetime]) -> List[Ticker]:
+            return self.__signed_request('fetch-history', '/user/rates/history',
+                                         _history_request(part[0], part[1], currency), parse=parse)
+
+        last = None
+        for tickers in _fan_out(self._executor, _time_windows(begin, end, window), fetch, self._workers):
+            tickers = _newer(tickers, last, lambda ticker: ticker.open_time)
+            if tickers:
+                last = tickers[-1].open_time
+            yield from tickers
+
+    def fetch_history_columns(self, begin: datetime, end: datetime, currency: str,
+                              scale: Optional[int] = None) -> TickerColumns:
+        """
+        Same as `fetch_history` but returns columnar result: numpy arrays of times and prices (requires numpy).
+
+        :param begin: earliest interesting time
+        :param end: latest interesting time
+        :param currency: currency name in upper case
+        :param scale: store prices and volume as int64 with the number of decimal digits (None - float64)
+        :return: historical tickers columns
         """
-        data = self.__signed_request('fetch-history', self._base_url + '/user/rates/history', {
-            "req": {
-                "currency": currency,
-                "fromTimestamp": int(begin.timestamp()),
-                "toTimestamp": int(end.timestamp())
+        return self.__signed_request('fetch-history-columns', '/user/rates/history',
+                                     _history_request(begin, end, currency),
+                                     parse=lambda data: TickerColumns.from_json_history(data, currency, scale))
+
+    def __fetch_orders(self, operation: str, path: str, symbol: str, limit: int) -> List[Order]:
+        return self.__signed_request(operation, path, {
+            'req': {
+                'limit': limit,
+                'symbolName': symbol
             }
-        })
-
-        for info in data:
-            yield Ticker.from_json_history(info)
-
-    def __signed_request(self, operation: str, url: str, json_data: dict) -> dict:
-        payload = json.dumps(json_data).encode()
-        signer = hmac.new(self.__secret.encode(), digestmod='SHA256')
-        signer.update(payload)
-        signature = signer.hexdigest()
-        headers = {
-            'X-Api-Signed-Token': self.__token + ',' + signature,
-        }
-        req = self._session.post(url, data=payload, headers=headers)
-        APIError.ensure(operation, req)
-        return req.json()
+        }, parse=partial(_parse_orders, model=self._models.order))
+
+    def __signed_stream(self, operation: str, path: str, json_data: dict, key: Optional[str] = None) -> Iterator[Any]:
+        payload = self._codec.dumps(json_data)
+        return self._stream(operation, 'POST', path, key, data=payload, headers=self.__signer.headers(payload))
+
+    def __signed_request(self, operation: str, path: str, json_data: dict,
+                         parse: Optional[Callable[[dict], R]] = None) -> R:
+        profiled = self._profiler is not None and self._profiler.sample()
+        started = time.perf_counter() if profiled else 0.0
+        payload = self._codec.dumps(json_data)
+        headers = self.__signer.headers(payload)
+        if profiled:
+            self._profiler.record(operation, 'sign', time.perf_counter() - started)
+        return self._request(operation, 'POST', path, data=payload, headers=headers, parse=parse, profiled=profiled)
@@ -0,0 +1,66 @@
+import json
+from typing import Any
+
+
+class JSONCodec:
+    """
+    JSON encoder and decoder for requests and responses based on the standard library.
+
+    Subclass and override `dumps`/`loads` to plug in other JSON library.
+    """
+
+    name = 'json'  #: codec name
+
+    def dumps(self, obj: Any) -> bytes:
+        """
+        Encode object to JSON
+
+        :param obj: object to encode
+        :return: UTF-8 encoded JSON
+        """
+        return json.dumps(obj).encode()
+
+    def loads(self, data: bytes) -> Any:
+        """
+        Decode JSON document
+
+        :param data: UTF-8 encoded JSON
+        :return: decoded object
+        """
+        return json.loads(data)
+
+
+class OrJSONCodec(JSONCodec):
+    """
+    JSON codec based on `orjson <https://github.com/ijl/orjson>`_ (should be installed separately)
+    """
+
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson  # pylint: disable=import-outside-toplevel
+        self.__orjson = orjson
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.__orjson.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self.__orjson.loads(data)
+
+
+def fast_codec() -> JSONCodec:
+    """
+    Get the fastest available codec: orjson if installed, otherwise standard library
+
+    .. highlight:: python
+    .. code-block:: python
+
+        import crix
+        from crix.codec import fast_codec
+
+        client = crix.Client(env='prod', codec=fast_codec())
+    """
+    try:
+        return OrJSONCodec()
+    except ImportError:
+        return JSONCodec()
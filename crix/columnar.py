@@ -0,0 +1,270 @@
+from decimal import Decimal
+from typing import NamedTuple, List, Optional, Any, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+def _require_numpy(feature: str = 'columnar results'):
+    """
+    Ensure that optional numpy dependency is installed (shared by all numpy-backed modules)
+    """
+    if np is None:
+        raise ImportError('numpy is required for {}: pip install crix[numpy]'.format(feature))
+
+
+def _scaled(value: Any, scale: int) -> int:
+    # decimal arithmetic: float keeps only ~16 significant digits
+    return int(Decimal(str(value)).scaleb(scale).to_integral_value())
+
+
+def _column(values: List[Any], scale: Optional[int]) -> 'np.ndarray':
+    if scale is None:
+        return np.fromiter(map(float, values), dtype=np.float64, count=len(values))
+    return np.fromiter((_scaled(value, scale) for value in values), dtype=np.int64, count=len(values))
+
+
+class TickerColumns(NamedTuple):
+    """
+    Columnar (structure of arrays) representation of K-lines built directly from decoded JSON
+    without per-row objects.
+
+    Times are epoch milliseconds (int64). Prices and volume are float64 arrays, or int64 arrays of values
+    multiplied by 10 ** `scale` if scale is defined (ex: scale 8 - 1.5 is stored as 150000000).
+
+    Requires numpy.
+    """
+    symbol_name: str
+    resolution: str
+    scale: Optional[int]  #: number of decimal digits in scaled int64 values (None for float64 values)
+    open_time: 'np.ndarray'
+    open: 'np.ndarray'
+    close: 'np.ndarray'
+    high: 'np.ndarray'
+    low: 'np.ndarray'
+    volume: 'np.ndarray'  # in base
+
+    @property
+    def size(self) -> int:
+        """
+        Number of K-lines
+        """
+        return len(self.open_time)
+
+    @staticmethod
+    def from_json(records: List[dict], symbol_name: str = '', resolution: str = '',
+                  scale: Optional[int] = None) -> 'TickerColumns':
+        """
+        Construct object from list of K-lines dictionaries
+
+        :param records: decoded K-lines
+        :param symbol_name: symbol name (used if records are empty)
+        :param resolution: K-line resolution (used if records are empty)
+        :param scale: store prices and volume as int64 with the number of decimal digits (None - float64)
+        """
+        _require_numpy()
+        if records:
+            symbol_name = records[0]['symbolName']
+            resolution = records[0]['resolution']
+        return TickerColumns(
+            symbol_name=symbol_name,
+            resolution=resolution,
+            scale=scale,
+            open_time=np.fromiter((info['openTime'] for info in records), dtype=np.int64, count=len(records)),
+            open=_column([info['open'] for info in records], scale),
+            close=_column([info['close'] for info in records], scale),
+            high=_column([info['high'] for info in records], scale),
+            low=_column([info['low'] for info in records], scale),
+            volume=_column([info['volume'] for info in records], scale),
+        )
+
+    @staticmethod
+    def from_json_history(records: List[dict], currency: str = '', scale: Optional[int] = None) -> 'TickerColumns':
+        """
+        Construct object from list of historical tickers dictionaries (for a fixed resolution)
+
+        :param records: decoded historical tickers
+        :param currency: currency name (used if records are empty)
+        :param scale: store prices and volume as int64 with the number of decimal digits (None - float64)
+        """
+        _require_numpy()
+        if records:
+            currency = records[0]['currency']
+        return TickerColumns(
+            symbol_name=currency,
+            resolution='D',
+            scale=scale,
+            open_time=np.fromiter((info['timestamp'] * 1000 for info in records), dtype=np.int64,
+                                  count=len(records)),
+            open=_column([info['open'] for info in records], scale),
+            close=_column([info['close'] for info in records], scale),
+            high=_column([info['high'] for info in records], scale),
+            low=_column([info['low'] for info in records], scale),
+            volume=_column([info['volume'] for info in records], scale),
+        )
+
+
+class BookSide(NamedTuple):
+    """
+    One side of the order book as parallel arrays sorted from the best price to the worst one
+    (asks - ascending prices, bids - descending prices) with precomputed cumulative sums.
+
+    Requires numpy.
+    """
+    is_ask: bool  #: side of the book
+    price: 'np.ndarray'  #: float64 price of levels
+    quantity: 'np.ndarray'  #: float64 quantity of levels
+    count: 'np.ndarray'  #: int64 number of orders on levels
+    cum_quantity: 'np.ndarray'  #: float64 total quantity from the best level up to the level (inclusive)
+    cum_notional: 'np.ndarray'  #: float64 total price * quantity from the best level up to the level (inclusive)
+    search_key: 'np.ndarray'  #: ascending keys for binary search (prices for asks, negative prices for bids)
+
+    @staticmethod
+    def from_json(offers: List[dict], is_ask: bool) -> 'BookSide':
+        """
+        Construct object from list of offers dictionaries
+
+        :param offers: decoded offers
+        :param is_ask: side of the offers (asks - True, bids - False)
+        """
+        _require_numpy()
+        price = _column([offer['p'] for offer in offers], None)
+        quantity = _column([offer['q'] for offer in offers], None)
+        count = np.fromiter((offer['c'] for offer in offers), dtype=np.int64, count=len(offers))
+        search_key = price if is_ask else -price
+        order = np.argsort(search_key, kind='stable')
+        price, quantity, count, search_key = price[order], quantity[order], count[order], search_key[order]
+        return BookSide(is_ask=is_ask,
+                        price=price,
+                        quantity=quantity,
+                        count=count,
+                        cum_quantity=np.cumsum(quantity),
+                        cum_notional=np.cumsum(price * quantity),
+                        search_key=search_key)
+
+    @property
+    def best(self) -> Optional[float]:
+        """
+        Best price or None if side is empty
+        """
+        if not len(self.price):
+            return None
+        return float(self.price[0])
+
+    def quantity_until(self, price: float) -> float:
+        """
+        Total quantity of levels with price not worse than the price
+
+        :param price: limit price
+        :return: total quantity
+        """
+        level = int(np.searchsorted(self.search_key, price if self.is_ask else -price, side='right'))
+        if level == 0:
+            return 0.0
+        return float(self.cum_quantity[level - 1])
+
+    def notional(self, quantity: float) -> Optional[float]:
+        """
+        Total price * quantity to fill quantity by the side levels starting from the best one
+
+        :param quantity: quantity to fill
+        :return: total notional or None if there is no enough liquidity
+        """
+        level = int(np.searchsorted(self.cum_quantity, quantity, side='left'))
+        if level >= len(self.cum_quantity):
+            return None
+        if level == 0:
+            return quantity * float(self.price[0])
+        rest = quantity - float(self.cum_quantity[level - 1])
+        return float(self.cum_notional[level - 1]) + rest * float(self.price[level])
+
+    def vwap(self, quantity: float) -> Optional[float]:
+        """
+        Volume weighted average price to fill quantity by the side levels
+
+        :param quantity: quantity to fill
+        :return: average price or None if there is no enough liquidity
+        """
+        if quantity <= 0:
+            return self.best
+        notional = self.notional(quantity)
+        if notional is None:
+            return None
+        return notional / quantity
+
+
+class DepthColumns(NamedTuple):
+    """
+    Array-backed order book with fast (binary search) queries: best prices, depth within a price range,
+    VWAP and slippage for a size.
+
+    Requires numpy.
+    """
+    symbol_name: str
+    last_update_id: int
+    asks: BookSide
+    bids: BookSide
+
+    @staticmethod
+    def from_json(info: dict) -> 'DepthColumns':
+        """
+        Construct object from dictionary
+        """
+        return DepthColumns(symbol_name=info['symbolName'],
+                            last_update_id=info['lastUpdateId'],
+                            asks=BookSide.from_json(info['asks'] or [], is_ask=True),
+                            bids=BookSide.from_json(info['bids'] or [], is_ask=False))
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        """
+        Lowest ask price or None if there are no asks
+        """
+        return self.asks.best
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        """
+        Highest bid price or None if there are no bids
+        """
+        return self.bids.best
+
+    def depth_within(self, percent: float) -> Tuple[float, float]:
+        """
+        Total quantity of bids and asks with prices within percent from the best price of the side
+
+        :param percent: price range in percents (ex: 1.5)
+        :return: pair of bids and asks quantities
+        """
+        bids = asks = 0.0
+        if self.best_bid is not None:
+            bids = self.bids.quantity_until(self.best_bid * (1 - percent / 100))
+        if self.best_ask is not None:
+            asks = self.asks.quantity_until(self.best_ask * (1 + percent / 100))
+        return bids, asks
+
+    def vwap(self, quantity: float, is_buy: bool) -> Optional[float]:
+        """
+        Average price of market order: buy takes asks, sell takes bids
+
+        :param quantity: order quantity
+        :param is_buy: order direction
+        :return: average price or None if there is no enough liquidity
+        """
+        return (self.asks if is_buy else self.bids).vwap(quantity)
+
+    def slippage(self, quantity: float, is_buy: bool) -> Optional[float]:
+        """
+        Relative difference between average price of market order and the best price (always positive)
+
+        :param quantity: order quantity
+        :param is_buy: order direction
+        :return: slippage as fraction (ex: 0.001 - 0.1%) or None if there is no enough liquidity
+        """
+        side = self.asks if is_buy else self.bids
+        price = side.vwap(quantity)
+        if price is None:
+            return None
+        return abs(price - side.best) / side.best
@@ -0,0 +1,185 @@
+import threading
+import time
+from bisect import bisect_right
+from decimal import Decimal
+from typing import Iterable, Dict, Tuple, Union, Optional
+
+from .columnar import np, _require_numpy
+from .models import VolumeFee, Symbol
+
+
+class FeeSchedule:
+    """
+    Fees of one symbol by trading volume: tiers are sorted by `min_volume` once, so the tier lookup is
+    a binary search. Volume below the lowest tier (or no tiers at all) uses the symbol's maker/taker fees.
+
+    Volume is in the same units as `VolumeFee.min_volume`.
+
+    .. highlight:: python
+    .. code-block:: python
+
+        from crix.fees import FeeSchedule
+
+        schedule = FeeSchedule.fetch(client, 'BTC_USDT')
+        fee = schedule.cost(price=Decimal('3500'), quantity=Decimal('0.1'), volume=Decimal('1200'), is_maker=False)
+    """
+
+    def __init__(self, symbol: str, tiers: Iterable[VolumeFee], maker_fee: Decimal = Decimal(0),
+                 taker_fee: Decimal = Decimal(0)):
+        self.symbol = symbol
+        self.tiers: Tuple[VolumeFee, ...] = tuple(sorted(tiers, key=lambda tier: tier.min_volume))
+        self.default = VolumeFee(min_volume=Decimal(0), maker_fee=maker_fee, taker_fee=taker_fee)
+        self.__volumes = [tier.min_volume for tier in self.tiers]
+        self.__arrays = None
+
+    @staticmethod
+    def from_symbol(symbol: Symbol, tiers: Iterable[VolumeFee]) -> 'FeeSchedule':
+        """
+        Build schedule from volume fees and fees of the symbol
+        """
+        return FeeSchedule(symbol.name, tiers, symbol.maker_fee, symbol.taker_fee)
+
+    @staticmethod
+    def fetch(client, symbol: str) -> 'FeeSchedule':
+        """
+        Build schedule by requests to the exchange
+
+        :param client: synchronous client
+        :param symbol: symbol name
+        """
+        info = client.fetch_markets().get(symbol)
+        tiers = client.fetch_volume_fees(symbol)
+        if info is None:
+            return FeeSchedule(symbol, tiers)
+        return FeeSchedule.from_symbol(info, tiers)
+
+    @staticmethod
+    async def async_fetch(client, symbol: str) -> 'FeeSchedule':
+        """
+        Build schedule by requests to the exchange (asyncio version)
+
+        :param client: asynchronous client
+        :param symbol: symbol name
+        """
+        info = (await client.fetch_markets()).get(symbol)
+        tiers = await client.fetch_volume_fees(symbol)
+        if info is None:
+            return FeeSchedule(symbol, tiers)
+        return FeeSchedule.from_symbol(info, tiers)
+
+    def tier(self, volume: Decimal) -> VolumeFee:
+        """
+        Tier of the volume: the one with the highest `min_volume` not more than the volume
+
+        :param volume: trading volume
+        :return: volume fee
+        """
+        index = bisect_right(self.__volumes, volume)
+        if index == 0:
+            return self.default
+        return self.tiers[index - 1]
+
+    def fee(self, volume: Decimal, is_maker: bool) -> Decimal:
+        """
+        Fee rate for the volume
+
+        :param volume: trading volume
+        :param is_maker: fill of maker (True) or taker (False) side
+        :return: fee as fraction (ex: 0.001 - 0.1%)
+        """
+        tier = self.tier(volume)
+        return tier.maker_fee if is_maker else tier.taker_fee
+
+    def cost(self, price: Decimal, quantity: Decimal, volume: Decimal, is_maker: bool) -> Decimal:
+        """
+        Fee of one fill
+
+        :param price: fill price
+        :param quantity: fill quantity
+        :param volume: trading volume
+        :param is_maker: fill of maker (True) or taker (False) side
+        :return: fee amount in quote currency
+        """
+        return price * quantity * self.fee(volume, is_maker)
+
+    def costs(self, price: 'np.ndarray', quantity: 'np.ndarray', volume: Union['np.ndarray', float],
+              is_maker: Union['np.ndarray', bool]) -> 'np.ndarray':
+        """
+        Fees of many fills at once (requires numpy). Arguments are float64 arrays of the same shape or scalars.
+
+        :param price: fill prices
+        :param quantity: fill quantities
+        :param volume: trading volumes
+        :param is_maker: sides of fills (True - maker)
+        :return: float64 array of fee amounts in quote currency
+        """
+        _require_numpy('vectorized fees')
+        if self.__arrays is None:
+            # index 0 - default fees, index N - tier N - 1
+            self.__arrays = (
+                np.array([float(tier.min_volume) for tier in self.tiers], dtype=np.float64),
+                np.array([float(tier.maker_fee) for tier in (self.default,) + self.tiers], dtype=np.float64),
+                np.array([float(tier.taker_fee) for tier in (self.default,) + self.tiers], dtype=np.float64),
+            )
+        volumes, maker, taker = self.__arrays
+        index = np.searchsorted(volumes, volume, side='right')
+        rate = np.where(is_maker, maker[index], taker[index])
+        return np.asarray(price, dtype=np.float64) * np.asarray(quantity, dtype=np.float64) * rate
+
+
+class FeeCache:
+    """
+    Thread-safe cache of fee schedules by symbol which are rebuilt after `ttl` seconds
+    """
+
+    def __init__(self, ttl: float = 300):
+        self.ttl = ttl
+        self.__schedules: Dict[str, Tuple[float, FeeSchedule]] = {}
+        self.__lock = threading.Lock()
+
+    def get(self, client, symbol: str) -> FeeSchedule:
+        """
+        Get cached or fetch new schedule of the symbol
+
+        :param client: synchronous client
+        :param symbol: symbol name
+        """
+        schedule = self.__cached(symbol)
+        if schedule is None:
+            schedule = FeeSchedule.fetch(client, symbol)
+            self.__put(schedule)
+        return schedule
+
+    async def async_get(self, client, symbol: str) -> FeeSchedule:
+        """
+        Get cached or fetch new schedule of the symbol (asyncio version)
+
+        :param client: asynchronous client
+        :param symbol: symbol name
+        """
+        schedule = self.__cached(symbol)
+        if schedule is None:
+            schedule = await FeeSchedule.async_fetch(client, symbol)
+            self.__put(schedule)
+        return schedule
+
+    def invalidate(self, symbol: Optional[str] = None):
+        """
+        Drop cached schedule of the symbol (or all schedules if symbol not defined)
+        """
+        with self.__lock:
+            if symbol is None:
+                self.__schedules.clear()
+            else:
+                self.__schedules.pop(symbol, None)
+
+    def __cached(self, symbol: str):
+        with self.__lock:
+            entry = self.__schedules.get(symbol)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def __put(self, schedule: FeeSchedule):
+        with self.__lock:
+            self.__schedules[schedule.symbol] = (time.monotonic() + self.ttl, schedule)
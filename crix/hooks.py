@@ -0,0 +1,46 @@
+from typing import NamedTuple, Optional, Callable
+
+
+class RequestInfo(NamedTuple):
+    """
+    Details of a request passed to hooks. Timings are in seconds, not measured values are None.
+    """
+    operation: str  #: logical operation name (ex: 'fetch-markets')
+    method: str  #: HTTP method
+    url: str  #: full URL
+    payload_size: int  #: size of the request body
+    attempt: int = 1  #: number of the attempt (starting from 1, more than 1 for retries)
+    status: Optional[int] = None  #: HTTP status (None before response and for connection errors)
+    response_size: Optional[int] = None  #: size of the response body (None if not read yet or streamed)
+    #: time of sending request and receiving response of the attempt (without rate limiter and retry waits,
+    #: None for streamed responses)
+    network: Optional[float] = None
+    decode: Optional[float] = None  #: time of JSON decoding
+    parse: Optional[float] = None  #: time of models building
+
+
+class Hooks(NamedTuple):
+    """
+    Callbacks invoked by clients around each HTTP request. Hooks are called synchronously in the request path
+    (in the event loop for async clients), so they should be fast and must not raise.
+
+    - `before_request` - before each attempt (including retries)
+    - `after_response` - after successful response is decoded and parsed (with all timings)
+    - `on_error` - after each failed attempt with the error (API error, connection error or timeout)
+
+    .. highlight:: python
+    .. code-block:: python
+
+        import logging
+        import crix
+        from crix.hooks import Hooks
+
+        def log_slow(info):
+            if info.network is not None and info.network > 1:
+                logging.warning('slow %s: %.3fs', info.operation, info.network)
+
+        client = crix.Client(env='prod', hooks=Hooks(after_response=log_slow))
+    """
+    before_request: Optional[Callable[[RequestInfo], None]] = None
+    after_response: Optional[Callable[[RequestInfo], None]] = None
+    on_error: Optional[Callable[[RequestInfo, Exception], None]] = None
@@ -0,0 +1,192 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import NamedTuple, Any, Callable, Dict, Iterator, Tuple
+
+from .models import Ticker, Offer, Order, Trade, OrderType, TimeInForce, OrderStatus
+
+
+class LazyModel:
+    """
+    Read-only model backed by raw decoded JSON. Fields are converted on first access and cached.
+
+    Lazy models mimic API of NamedTuple models (attributes, iteration, indexing, `_fields`, `_asdict`)
+    and could be converted to them by `to_model`. Useful for bulk requests where only a few fields are used.
+    """
+
+    _model: type  #: eager NamedTuple model (defined by subclasses)
+    _converters: Dict[str, Callable[[dict], Any]] = {}  #: field name -> function to build value from raw JSON
+
+    def __init__(self, raw: dict):
+        self._raw = raw
+
+    def __getattr__(self, name: str) -> Any:
+        converter = self._converters.get(name)
+        if converter is None:
+            raise AttributeError(name)
+        value = converter(self._raw)
+        # next access finds value in the instance dict without calling __getattr__
+        self.__dict__[name] = value
+        return value
+
+    @property
+    def _fields(self) -> Tuple[str, ...]:
+        return self._model._fields
+
+    def _asdict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self._fields}
+
+    def to_model(self) -> tuple:
+        """
+        Convert all fields and build eager NamedTuple model
+        """
+        return self._model(*self)
+
+    def __iter__(self) -> Iterator[Any]:
+        return (getattr(self, name) for name in self._fields)
+
+    def __getitem__(self, index):
+        return tuple(self)[index]
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (tuple, LazyModel)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(tuple(self))
+
+    def __repr__(self) -> str:
+        return '{}({})'.format(self._model.__name__,
+                               ', '.join('{}={!r}'.format(name, value) for name, value in self._asdict().items()))
+
+
+def _timestamp_ms(key: str) -> Callable[[dict], datetime]:
+    return lambda info: datetime.fromtimestamp(info.get(key, 0) / 1000)
+
+
+class LazyTicker(LazyModel):
+    _model = Ticker
+    _converters = {
+        'symbol_name': lambda info: info['symbolName'],
+        'open_time': _timestamp_ms('openTime'),
+        'open': lambda info: Decimal(info['open']),
+        'close': lambda info: Decimal(info['close']),
+        'high': lambda info: Decimal(info['high']),
+        'low': lambda info: Decimal(info['low']),
+        'volume': lambda info: Decimal(info['volume']),
+        'resolution': lambda info: info['resolution'],
+    }
+
+    @staticmethod
+    def from_json(info: dict) -> 'LazyTicker':
+        """
+        Construct object from dictionary
+        """
+        return LazyTicker(info)
+
+    @staticmethod
+    def from_json_history(info: dict) -> 'LazyHistoryTicker':
+        """
+        Construct object from dictionary (for a fixed resolution)
+        """
+        return LazyHistoryTicker(info)
+
+
+class LazyHistoryTicker(LazyTicker):
+    _converters = {
+        'symbol_name': lambda info: info['currency'],
+        'open_time': lambda info: datetime.fromtimestamp(info['timestamp']),
+        'open': lambda info: Decimal(str(info['open'])),
+        'close': lambda info: Decimal(str(info['close'])),
+        'high': lambda info: Decimal(str(info['high'])),
+        'low': lambda info: Decimal(str(info['low'])),
+        'volume': lambda info: Decimal(str(info['volume'])),
+        'resolution': lambda info: 'D',
+    }
+
+
+class LazyOffer(LazyModel):
+    _model = Offer
+    _converters = {
+        'count': lambda info: info['c'],
+        'price': lambda info: Decimal(info['p']),
+        'quantity': lambda info: Decimal(info['q']),
+    }
+
+    @staticmethod
+    def from_json(info: dict) -> 'LazyOffer':
+        """
+        Construct object from dictionary
+        """
+        return LazyOffer(info)
+
+
+class LazyOrder(LazyModel):
+    _model = Order
+    _converters = {
+        'id': lambda info: info['orderId'],
+        'user_id': lambda info: info['userId'],
+        'type': lambda info: OrderType(info.get('type', 0)),
+        'symbol_name': lambda info: info['symbolName'],
+        'is_buy': lambda info: info['isBuy'],
+        'quantity': lambda info: Decimal(info['quantity'] or '0'),
+        'price': lambda info: Decimal(info['price'] or '0'),
+        'stop_price': lambda info: Decimal(info['stopPrice'] or '0'),
+        'filled_quantity': lambda info: Decimal(info['filledQuantity'] or '0'),
+        'time_in_force': lambda info: TimeInForce(info['timeInForce']),
+        'expire_time': lambda info: datetime.fromtimestamp(info['expireTime'] / 1000) if info['expireTime'] and info[
+            'expireTime'] > 0 else None,
+        'status': lambda info: OrderStatus(info['status']),
+        'created_at': _timestamp_ms('createdAt'),
+        'last_updated_at': _timestamp_ms('lastUpdateAt'),
+    }
+
+    @staticmethod
+    def from_json(info: dict) -> 'LazyOrder':
+        """
+        Construct object from dictionary
+        """
+        return LazyOrder(info)
+
+
+class LazyTrade(LazyModel):
+    _model = Trade
+    _converters = {
+        'id': lambda info: info['id'],
+        'user_id': lambda info: info.get('userId', 0),
+        'created_at': _timestamp_ms('createdAt'),
+        'order_filled': lambda info: info.get('orderFilled', False),
+        'is_buy': lambda info: info['isBuy'],
+        'order_id': lambda info: info.get('orderId', 0),
+        'price': lambda info: Decimal(info['price']),
+        'quantity': lambda info: Decimal(info['quantity']),
+        'fee': lambda info: Decimal(info['fee'] or '0'),
+        'fee_currency': lambda info: info.get('feeCurrency', ''),
+        'symbol_name': lambda info: info['symbolName'],
+    }
+
+    @staticmethod
+    def from_json(info: dict) -> 'LazyTrade':
+        """
+        Construct object from dictionary
+        """
+        return LazyTrade(info)
+
+
+class ModelSet(NamedTuple):
+    """
+    Models used by clients to build results
+    """
+    ticker: type
+    offer: type
+    order: type
+    trade: type
+
+
+#: eager NamedTuple models (default)
+EAGER_MODELS = ModelSet(ticker=Ticker, offer=Offer, order=Order, trade=Trade)
+#: lazy raw-backed models
+LAZY_MODELS = ModelSet(ticker=LazyTicker, offer=LazyOffer, order=LazyOrder, trade=LazyTrade)
@@ -0,0 +1,191 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, Optional, Tuple, List
+
+#: default upper bounds of latency histogram buckets in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+#: phases of request latency: network (successful attempt only), JSON decoding, models building
+PHASES = ('network', 'decode', 'parse')
+
+
+class Histogram:
+    """
+    Latency histogram with fixed buckets (not thread-safe, guarded by `Metrics`)
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  #: observations per bucket, the last one is +Inf
+        self.sum = 0.0  #: total of observed values
+        self.count = 0  #: number of observations
+
+    def observe(self, value: float):
+        """
+        Add observation
+
+        :param value: observed value in seconds
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        """
+        Copy of the histogram as dictionary with cumulative bucket counts (like Prometheus)
+        """
+        cumulative = []
+        total = 0
+        for count in self.counts[:-1]:
+            total += count
+            cumulative.append(total)
+        return {
+            'buckets': dict(zip(self.buckets, cumulative)),
+            'sum': self.sum,
+            'count': self.count,
+        }
+
+
+class OperationMetrics:
+    """
+    Metrics of one logical operation
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.requests = 0  #: number of completed requests
+        self.errors: Dict[int, int] = {}  #: failed attempts by HTTP status (0 - connection error or timeout)
+        self.bytes_sent = 0  #: size of request bodies
+        self.bytes_received = 0  #: size of response bodies
+        self.latency = {phase: Histogram(buckets) for phase in PHASES}
+
+    def snapshot(self) -> dict:
+        """
+        Copy of the metrics as dictionary
+        """
+        return {
+            'requests': self.requests,
+            'errors': dict(self.errors),
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'latency': {phase: histogram.snapshot() for phase, histogram in self.latency.items()},
+        }
+
+
+class Metrics:
+    """
+    Thread-safe per-operation metrics of a client: requests, errors by HTTP status, latency histograms of
+    network, JSON decoding and models building phases, bytes transferred.
+
+    Operations are the logical names used in `APIError` (ex: 'fetch-markets', 'create-order').
+    Responses served from the response cache are not counted. Streamed responses are counted without
+    latency and received bytes.
+
+    .. highlight:: python
+    .. code-block:: python
+
+        import crix
+        from crix.metrics import Metrics
+
+        metrics = Metrics()
+        client = crix.Client(env='prod', metrics=metrics)
+        client.fetch_markets()
+        print(metrics.snapshot()['fetch-markets']['latency']['network']['sum'])
+        print(metrics.prometheus())
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.__operations: Dict[str, OperationMetrics] = {}
+        self.__lock = threading.Lock()
+
+    def record(self, operation: str, network: Optional[float], decode: Optional[float], parse: Optional[float],
+               sent: int = 0, received: int = 0):
+        """
+        Record completed request
+
+        :param operation: logical operation name
+        :param network: seconds spent on sending request and receiving response (None - not measured)
+        :param decode: seconds spent on JSON decoding (None - not measured)
+        :param parse: seconds spent on building models (None - not measured)
+        :param sent: size of request body
+        :param received: size of response body
+        """
+        with self.__lock:
+            metrics = self.__operation(operation)
+            metrics.requests += 1
+            metrics.bytes_sent += sent
+            metrics.bytes_received += received
+            for phase, value in zip(PHASES, (network, decode, parse)):
+                if value is not None:
+                    metrics.latency[phase].observe(value)
+
+    def record_error(self, operation: str, status: int = 0):
+        """
+        Record failed attempt of request
+
+        :param operation: logical operation name
+        :param status: HTTP status (0 - connection error or timeout)
+        """
+        with self.__lock:
+            errors = self.__operation(operation).errors
+            errors[status] = errors.get(status, 0) + 1
+
+    def reset(self):
+        """
+        Remove all collected metrics
+        """
+        with self.__lock:
+            self.__operations.clear()
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        Copy of collected metrics by operation
+        """
+        with self.__lock:
+            return {operation: metrics.snapshot() for operation, metrics in self.__operations.items()}
+
+    def prometheus(self, prefix: str = 'crix') -> str:
+        """
+        Collected metrics in Prometheus text exposition format
+
+        :param prefix: prefix of metrics names
+        """
+        snapshot = self.snapshot()
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str):
+            lines.append('# HELP {}_{} {}'.format(prefix, name, help_text))
+            lines.append('# TYPE {}_{} {}'.format(prefix, name, kind))
+
+        family('requests_total', 'counter', 'Completed requests by operation')
+        for operation, metrics in snapshot.items():
+            lines.append('{}_requests_total{{operation="{}"}} {}'.format(prefix, operation, metrics['requests']))
+        family('errors_total', 'counter', 'Failed attempts by operation and HTTP status (0 - connection error)')
+        for operation, metrics in snapshot.items():
+            for status, count in sorted(metrics['errors'].items()):
+                lines.append('{}_errors_total{{operation="{}",status="{}"}} {}'.format(prefix, operation, status,
+                                                                                     count))
+        for direction in ('sent', 'received'):
+            family('bytes_{}_total'.format(direction), 'counter', 'Bytes {} in bodies by operation'.format(direction))
+            for operation, metrics in snapshot.items():
+                lines.append('{}_bytes_{}_total{{operation="{}"}} {}'.format(prefix, direction, operation,
+                                                                             metrics['bytes_' + direction]))
+        for phase in PHASES:
+            name = '{}_seconds'.format(phase)
+            family(name, 'histogram', 'Latency of {} phase by operation'.format(phase))
+            for operation, metrics in snapshot.items():
+                histogram = metrics['latency'][phase]
+                for bound, count in histogram['buckets'].items():
+                    lines.append('{}_{}_bucket{{operation="{}",le="{}"}} {}'.format(prefix, name, operation, bound,
+                                                                                   count))
+                lines.append('{}_{}_bucket{{operation="{}",le="+Inf"}} {}'.format(prefix, name, operation,
+                                                                                 histogram['count']))
+                lines.append('{}_{}_sum{{operation="{}"}} {}'.format(prefix, name, operation, histogram['sum']))
+                lines.append('{}_{}_count{{operation="{}"}} {}'.format(prefix, name, operation, histogram['count']))
+        return '\n'.join(lines) + '\n'
+
+    def __operation(self, operation: str) -> OperationMetrics:
+        metrics = self.__operations.get(operation)
+        if metrics is None:
+            metrics = self.__operations[operation] = OperationMetrics(self.buckets)
+        return metrics
@@ -1,7 +1,7 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from decimal import Decimal
 from enum import Enum
-from typing import NamedTuple, List, Optional, Union
+from typing import NamedTuple, List, Optional, Union, Iterable, Tuple, Dict
 
 
 class Symbol(NamedTuple):
@@ -49,6 +49,100 @@ class Symbol(NamedTuple):
         )
 
 
+class MarketsChanges(NamedTuple):
+    added: Tuple[Symbol, ...]
+    removed: Tuple[Symbol, ...]
+    changed: Tuple[Symbol, ...]  # new definitions of symbols with changed details
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+class Markets(tuple):
+    """
+    Immutable sequence of symbols with indexes by name, base and quote currency.
+
+    Indexes are built once, so lookups do not scan symbols.
+    """
+
+    def __new__(cls, symbols: Iterable[Symbol]) -> 'Markets':
+        markets = super().__new__(cls, symbols)
+        by_name: Dict[str, Symbol] = {}
+        by_base: Dict[str, List[Symbol]] = {}
+        by_quote: Dict[str, List[Symbol]] = {}
+        for sym in markets:
+            by_name[sym.name] = sym
+            by_base.setdefault(sym.base, []).append(sym)
+            by_quote.setdefault(sym.quote, []).append(sym)
+        markets.__by_name = by_name
+        markets.__by_base = {currency: tuple(items) for currency, items in by_base.items()}
+        markets.__by_quote = {currency: tuple(items) for currency, items in by_quote.items()}
+        markets.__names = tuple(by_name)
+        markets.__currency_codes = tuple((sym.base + "_" + sym.quote).lower() for sym in markets)
+        return markets
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        """
+        Names of all symbols
+        """
+        return self.__names
+
+    @property
+    def currency_codes(self) -> Tuple[str, ...]:
+        """
+        Currencies codes in base_quote format (ex. btc_bch)
+        """
+        return self.__currency_codes
+
+    def get(self, name: str) -> Optional[Symbol]:
+        """
+        Find symbol by name
+
+        :param name: symbol name (ex: BTC_USDT)
+        :return: symbol or None if nothing found
+        """
+        return self.__by_name.get(name)
+
+    def with_base(self, currency: str) -> Tuple[Symbol, ...]:
+        """
+        Find symbols by base currency
+
+        :param currency: currency name in upper case
+        :return: symbols with the base currency
+        """
+        return self.__by_base.get(currency, ())
+
+    def with_quote(self, currency: str) -> Tuple[Symbol, ...]:
+        """
+        Find symbols by quote currency
+
+        :param currency: currency name in upper case
+        :return: symbols with the quote currency
+        """
+        return self.__by_quote.get(currency, ())
+
+    def diff(self, previous: Optional['Markets']) -> MarketsChanges:
+        """
+        Compare with previous state of markets
+
+        :param previous: markets from previous refresh (None means that all symbols are new)
+        :return: added, removed and changed symbols
+        """
+        if previous is None:
+            return MarketsChanges(added=tuple(self), removed=(), changed=())
+        added = []
+        changed = []
+        for sym in self:
+            old = previous.get(sym.name)
+            if old is None:
+                added.append(sym)
+            elif old != sym:
+                changed.append(sym)
+        removed = tuple(sym for sym in previous if sym.name not in self.__by_name)
+        return MarketsChanges(added=tuple(added), removed=removed, changed=tuple(changed))
+
+
 class Ticker(NamedTuple):
     symbol_name: str
     open_time: datetime
@@ -156,17 +250,20 @@ class Depth(NamedTuple):
     bids: List[Offer]
 
     @staticmethod
-    def from_json(info: dict) -> 'Depth':
+    def from_json(info: dict, offer: type = Offer) -> 'Depth':
         """
         Construct object from dictionary
+
+        :param info: decoded JSON
+        :param offer: offer model (Offer or compatible class with `from_json`)
         """
         return Depth(
             symbol_name=info['symbolName'],
             level_aggregation=info['strLevelAggregation'],
             last_update_id=info['lastUpdateId'],
             is_aggregated=info['aggregated'],
-            asks=[Offer.from_json(offer) for offer in (info['asks'] or [])],
-            bids=[Offer.from_json(offer) for offer in (info['bids'] or [])],
+            asks=[offer.from_json(item) for item in (info['asks'] or [])],
+            bids=[offer.from_json(item) for item in (info['bids'] or [])],
         )
 
 
@@ -181,6 +278,17 @@ class Resolution(Enum):
     day = 'D'
     week = 'W'
 
+    @property
+    def interval(self) -> timedelta:
+        """
+        Duration of one K-line
+        """
+        if self is Resolution.day:
+            return timedelta(days=1)
+        if self is Resolution.week:
+            return timedelta(weeks=1)
+        return timedelta(minutes=int(self.value))
+
 
 class TimeInForce(Enum):
     good_till_cancel = 0
@@ -313,6 +421,23 @@ class NewOrder(NamedTuple):
                         **args)
 
 
+class OrderResult(NamedTuple):
+    """
+    Result of one operation in a batch (create_orders, cancel_all): resulting order or error
+    """
+    #: new order to create, order to cancel or symbol which open orders could not be scanned (cancel_all)
+    request: Union[NewOrder, Order, str]
+    order: Optional[Order]  #: order state returned by the exchange (None if failed)
+    error: Optional[Exception]  #: reason of the failure (None if succeeded)
+
+    @property
+    def ok(self) -> bool:
+        """
+        Operation succeeded
+        """
+        return self.error is None
+
+
 class Trade(NamedTuple):
     id: int
     user_id: int  # matches user account that made an order
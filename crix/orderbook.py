@@ -0,0 +1,202 @@
+import asyncio
+import threading
+import time
+from decimal import Decimal
+from typing import NamedTuple, Optional, Dict, List, Tuple, Callable
+
+import requests
+from aiohttp import ClientError
+
+from .client import APIError
+from .models import Depth, Offer
+
+
+class LevelChange(NamedTuple):
+    is_bid: bool
+    price: Decimal
+    quantity: Decimal  #: new quantity of the level, 0 if level removed
+    count: int  #: new number of orders on the level, 0 if level removed
+
+
+class BookUpdate(NamedTuple):
+    symbol_name: str
+    last_update_id: int
+    changes: Tuple[LevelChange, ...]
+
+
+class LocalOrderBook:
+    """
+    Locally maintained order book of one symbol.
+
+    Book is updated by snapshots (`apply`, `refresh` or background polling by `run`/`async_run`): snapshots
+    with `last_update_id` not newer than the current one are skipped, for others only changed levels
+    are applied and published to subscribers as `BookUpdate`. Failed polls are reported to `on_error`
+    and polling continues with the next interval.
+
+    .. highlight:: python
+    .. code-block:: python
+
+        import asyncio
+        import crix
+        from crix.orderbook import LocalOrderBook
+
+        async def run(client: crix.AsyncClient):
+            book = LocalOrderBook('BTC_USDT')
+            book.subscribe(lambda update: print(len(update.changes), 'levels changed'))
+            await book.async_run(client, interval=0.5, on_error=lambda err: print('poll failed:', err))
+    """
+
+    def __init__(self, symbol: str, level_aggregation: Optional[str] = None):
+        self.symbol = symbol
+        self.level_aggregation = level_aggregation
+        self.last_update_id: Optional[int] = None
+        self.__asks: Dict[Decimal, Offer] = {}
+        self.__bids: Dict[Decimal, Offer] = {}
+        self.__sorted_asks: Tuple[Offer, ...] = ()
+        self.__sorted_bids: Tuple[Offer, ...] = ()
+        self.__listeners: List[Callable[[BookUpdate], None]] = []
+        self.__lock = threading.Lock()
+
+    @property
+    def asks(self) -> Tuple[Offer, ...]:
+        """
+        Asks sorted from the lowest price
+        """
+        return self.__sorted_asks
+
+    @property
+    def bids(self) -> Tuple[Offer, ...]:
+        """
+        Bids sorted from the highest price
+        """
+        return self.__sorted_bids
+
+    def snapshot(self) -> Optional[Depth]:
+        """
+        Consistent copy of the book or None if nothing applied yet
+        """
+        with self.__lock:
+            if self.last_update_id is None:
+                return None
+            return Depth(symbol_name=self.symbol,
+                         is_aggregated=self.level_aggregation is not None,
+                         last_update_id=self.last_update_id,
+                         level_aggregation=self.level_aggregation,
+                         asks=list(self.__sorted_asks),
+                         bids=list(self.__sorted_bids))
+
+    def subscribe(self, callback: Callable[[BookUpdate], None]):
+        """
+        Register function which will be called for each applied update with changes
+
+        :param callback: update handler
+        """
+        self.__listeners.append(callback)
+
+    def unsubscribe(self, callback: Callable[[BookUpdate], None]):
+        """
+        Remove registered update handler
+
+        :param callback: update handler
+        """
+        self.__listeners.remove(callback)
+
+    def apply(self, depth: Depth) -> Optional[BookUpdate]:
+        """
+        Apply order book snapshot
+
+        :param depth: order book snapshot of the same symbol
+        :return: applied changes or None if snapshot is stale
+        """
+        with self.__lock:
+            if self.last_update_id is not None and depth.last_update_id <= self.last_update_id:
+                return None
+            changes = []
+            asks = self.__apply_side(self.__asks, depth.asks, False, changes)
+            bids = self.__apply_side(self.__bids, depth.bids, True, changes)
+            self.last_update_id = depth.last_update_id
+            if asks is not None:
+                self.__asks = asks
+                self.__sorted_asks = tuple(sorted(asks.values(), key=lambda offer: offer.price))
+            if bids is not None:
+                self.__bids = bids
+                self.__sorted_bids = tuple(sorted(bids.values(), key=lambda offer: offer.price, reverse=True))
+            update = BookUpdate(symbol_name=self.symbol, last_update_id=depth.last_update_id, changes=tuple(changes))
+        if changes:
+            for listener in list(self.__listeners):
+                listener(update)
+        return update
+
+    def refresh(self, client) -> Optional[BookUpdate]:
+        """
+        Fetch and apply order book snapshot
+
+        :param client: synchronous client (crix.Client or crix.AuthorizedClient)
+        :return: applied changes or None if snapshot is stale
+        """
+        return self.apply(client.fetch_order_book(self.symbol, self.level_aggregation))
+
+    async def async_refresh(self, client) -> Optional[BookUpdate]:
+        """
+        Fetch and apply order book snapshot (asyncio version)
+
+        :param client: asynchronous client (crix.AsyncClient or crix.AsyncAuthorizedClient)
+        :return: applied changes or None if snapshot is stale
+        """
+        return self.apply(await client.fetch_order_book(self.symbol, self.level_aggregation))
+
+    def run(self, client, interval: float, stop: Optional[threading.Event] = None,
+            on_error: Optional[Callable[[Exception], None]] = None):
+        """
+        Poll order book each interval until stop event is set (blocks current thread)
+
+        :param client: synchronous client
+        :param interval: seconds between polls
+        :param stop: stop event (if not defined - poll forever)
+        :param on_error: handler of failed polls (API error, connection error or timeout)
+        """
+        stop = stop or threading.Event()
+        deadline = time.monotonic()
+        while not stop.is_set():
+            try:
+                self.refresh(client)
+            except (APIError, requests.RequestException) as err:
+                if on_error is not None:
+                    on_error(err)
+            # missed polls (slow request) are skipped instead of being sent in a burst
+            deadline = max(deadline + interval, time.monotonic())
+            stop.wait(max(0.0, deadline - time.monotonic()))
+
+    async def async_run(self, client, interval: float, on_error: Optional[Callable[[Exception], None]] = None):
+        """
+        Poll order book each interval until cancelled
+
+        :param client: asynchronous client
+        :param interval: seconds between polls
+        :param on_error: handler of failed polls (API error, connection error or timeout)
+        """
+        deadline = time.monotonic()
+        while True:
+            try:
+                await self.async_refresh(client)
+            except (APIError, ClientError, asyncio.TimeoutError) as err:
+                if on_error is not None:
+                    on_error(err)
+            # missed polls (slow request) are skipped instead of being sent in a burst
+            deadline = max(deadline + interval, time.monotonic())
+            await asyncio.sleep(max(0.0, deadline - time.monotonic()))
+
+    @staticmethod
+    def __apply_side(levels: Dict[Decimal, Offer], offers: List[Offer], is_bid: bool,
+                     changes: List[LevelChange]) -> Optional[Dict[Decimal, Offer]]:
+        updated = {offer.price: offer for offer in offers}
+        start = len(changes)
+        for price, offer in updated.items():
+            old = levels.get(price)
+            if old is None or old.quantity != offer.quantity or old.count != offer.count:
+                changes.append(LevelChange(is_bid=is_bid, price=price, quantity=offer.quantity, count=offer.count))
+        for price in levels.keys() - updated.keys():
+            changes.append(LevelChange(is_bid=is_bid, price=price, quantity=Decimal(0), count=0))
+        if len(changes) == start:
+            return None
+        return updated
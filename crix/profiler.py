@@ -0,0 +1,95 @@
+import random
+import threading
+from typing import NamedTuple, Optional, Dict, Tuple
+
+#: measured phases of a call: request signing, network I/O, JSON decoding, models building
+PROFILE_PHASES = ('sign', 'network', 'decode', 'parse')
+
+
+class PhaseStats(NamedTuple):
+    count: int  #: number of sampled calls
+    total: float  #: total time in seconds
+    max: float  #: longest time in seconds
+
+    @property
+    def mean(self) -> float:
+        """
+        Average time in seconds
+        """
+        return self.total / self.count if self.count else 0.0
+
+
+class SamplingProfiler:
+    """
+    Opt-in profiler of client calls: for a random `rate` fraction of calls records time spent in signing,
+    network I/O, JSON decoding and models building by operation. Not sampled calls only pay for a random number.
+
+    .. highlight:: python
+    .. code-block:: python
+
+        import crix
+        from crix.profiler import SamplingProfiler
+
+        profiler = SamplingProfiler(rate=0.05)
+        client = crix.AuthorizedClient(token, secret, env='prod', profiler=profiler)
+        ...
+        print(profiler.report())
+    """
+
+    def __init__(self, rate: float = 0.01, seed: Optional[int] = None):
+        self.rate = rate
+        self.__random = random.Random(seed)
+        self.__phases: Dict[Tuple[str, str], PhaseStats] = {}
+        self.__lock = threading.Lock()
+
+    def sample(self) -> bool:
+        """
+        Decide if the current call should be profiled
+        """
+        return self.__random.random() < self.rate
+
+    def record(self, operation: str, phase: str, seconds: float):
+        """
+        Record time of a phase of a sampled call
+
+        :param operation: logical operation name
+        :param phase: one of `PROFILE_PHASES`
+        :param seconds: spent time
+        """
+        with self.__lock:
+            stats = self.__phases.get((operation, phase))
+            if stats is None:
+                self.__phases[(operation, phase)] = PhaseStats(count=1, total=seconds, max=seconds)
+            else:
+                self.__phases[(operation, phase)] = PhaseStats(count=stats.count + 1, total=stats.total + seconds,
+                                                               max=max(stats.max, seconds))
+
+    def stats(self) -> Dict[str, Dict[str, PhaseStats]]:
+        """
+        Collected statistics by operation and phase
+        """
+        result: Dict[str, Dict[str, PhaseStats]] = {}
+        with self.__lock:
+            for (operation, phase), stats in self.__phases.items():
+                result.setdefault(operation, {})[phase] = stats
+        return result
+
+    def reset(self):
+        """
+        Remove collected statistics
+        """
+        with self.__lock:
+            self.__phases.clear()
+
+    def report(self) -> str:
+        """
+        Text table of phases sorted by total time (the hottest first)
+        """
+        with self.__lock:
+            rows = sorted(self.__phases.items(), key=lambda item: item[1].total, reverse=True)
+        lines = ['{:<28} {:<8} {:>8} {:>12} {:>12} {:>12}'.format('operation', 'phase', 'count', 'total, ms',
+                                                                  'mean, ms', 'max, ms')]
+        for (operation, phase), stats in rows:
+            lines.append('{:<28} {:<8} {:>8} {:>12.3f} {:>12.3f} {:>12.3f}'.format(
+                operation, phase, stats.count, stats.total * 1000, stats.mean * 1000, stats.max * 1000))
+        return '\n'.join(lines)
@@ -0,0 +1,186 @@
+import asyncio
+import threading
+import time
+from typing import NamedTuple, Optional, Dict
+
+
+class BucketStats(NamedTuple):
+    requests: int  #: total number of acquired tokens
+    delayed: int  #: number of requests that had to wait
+    queue_depth: int  #: number of requests waiting right now
+    total_wait: float  #: summary time (in seconds) spent in the queue
+    max_wait: float  #: longest time (in seconds) spent in the queue
+
+
+class TokenBucket:
+    """
+    Token bucket: allows `burst` requests at once and `rate` requests per second in average.
+
+    Requests over the limit are not rejected but queued: each caller reserves next free slot
+    and sleeps until it comes, so waiting requests are served in FIFO order.
+    The same bucket could be used from threads (blocking `acquire`) and from coroutines (`async_acquire`).
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError('rate should be positive')
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.__lock = threading.Lock()
+        self.__tokens = float(self.burst)
+        self.__updated = time.monotonic()
+        self.__requests = 0
+        self.__delayed = 0
+        self.__waiting = 0
+        self.__total_wait = 0.0
+        self.__max_wait = 0.0
+
+    def reserve(self) -> float:
+        """
+        Take one token (possibly in debt) without waiting
+
+        :return: time in seconds to wait before request could be made
+        """
+        with self.__lock:
+            now = time.monotonic()
+            self.__tokens = min(self.burst, self.__tokens + (now - self.__updated) * self.rate)
+            self.__updated = now
+            self.__tokens -= 1
+            self.__requests += 1
+            if self.__tokens >= 0:
+                return 0.0
+            delay = -self.__tokens / self.rate
+            self.__delayed += 1
+            self.__total_wait += delay
+            self.__max_wait = max(self.__max_wait, delay)
+            return delay
+
+    def acquire(self) -> float:
+        """
+        Take one token and block current thread until request is allowed
+
+        :return: time in seconds spent in the queue
+        """
+        delay = self.reserve()
+        if delay > 0:
+            self.__enter_queue()
+            try:
+                time.sleep(delay)
+            finally:
+                self.__leave_queue()
+        return delay
+
+    async def async_acquire(self) -> float:
+        """
+        Take one token and wait (asyncio version) until request is allowed
+
+        :return: time in seconds spent in the queue
+        """
+        delay = self.reserve()
+        if delay > 0:
+            self.__enter_queue()
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                self.__leave_queue()
+        return delay
+
+    def stats(self) -> BucketStats:
+        """
+        Snapshot of the bucket usage
+        """
+        with self.__lock:
+            return BucketStats(requests=self.__requests,
+                               delayed=self.__delayed,
+                               queue_depth=self.__waiting,
+                               total_wait=self.__total_wait,
+                               max_wait=self.__max_wait)
+
+    def __enter_queue(self):
+        with self.__lock:
+            self.__waiting += 1
+
+    def __leave_queue(self):
+        with self.__lock:
+            self.__waiting -= 1
+
+
+class RateLimiter:
+    """
+    Client-side requests scheduler. Requests are paced by token buckets selected by endpoint path:
+
+    - bucket from `endpoints` if path is listed there (ex: '/depths', '/klines')
+    - `private` bucket for signed user requests (paths started from '/user/')
+    - `public` bucket for all other requests
+
+    Missed buckets mean no limits for the group. The same limiter could be shared between several clients
+    (both synchronous and asynchronous) to pace them together.
+
+    .. highlight:: python
+    .. code-block:: python
+
+        import crix
+        from crix.ratelimit import RateLimiter, TokenBucket
+
+        limiter = RateLimiter(public=TokenBucket(rate=50, burst=10),
+                              private=TokenBucket(rate=20, burst=5),
+                              endpoints={'/klines': TokenBucket(rate=5)})
+        client = crix.Client(env='prod', rate_limiter=limiter)
+    """
+
+    def __init__(self, public: Optional[TokenBucket] = None, private: Optional[TokenBucket] = None,
+                 endpoints: Optional[Dict[str, TokenBucket]] = None):
+        self.public = public
+        self.private = private
+        self.endpoints = dict(endpoints or {})
+
+    def bucket(self, path: str) -> Optional[TokenBucket]:
+        """
+        Find bucket for the endpoint
+
+        :param path: API path (ex: '/depths')
+        :return: token bucket or None if requests to the endpoint are not limited
+        """
+        bucket = self.endpoints.get(path)
+        if bucket is not None:
+            return bucket
+        if path.startswith('/user/'):
+            return self.private
+        return self.public
+
+    def acquire(self, path: str) -> float:
+        """
+        Block current thread until request to the endpoint is allowed
+
+        :param path: API path
+        :return: time in seconds spent in the queue
+        """
+        bucket = self.bucket(path)
+        if bucket is None:
+            return 0.0
+        return bucket.acquire()
+
+    async def async_acquire(self, path: str) -> float:
+        """
+        Wait (asyncio version) until request to the endpoint is allowed
+
+        :param path: API path
+        :return: time in seconds spent in the queue
+        """
+        bucket = self.bucket(path)
+        if bucket is None:
+            return 0.0
+        return await bucket.async_acquire()
+
+    def stats(self) -> Dict[str, BucketStats]:
+        """
+        Usage of all buckets: keys are 'public', 'private' and endpoints paths
+        """
+        result = {}
+        if self.public is not None:
+            result['public'] = self.public.stats()
+        if self.private is not None:
+            result['private'] = self.private.stats()
+        for path, bucket in self.endpoints.items():
+            result[path] = bucket.stats()
+        return result
@@ -0,0 +1,58 @@
+import random
+from typing import NamedTuple, Optional, FrozenSet
+
+#: operations which are safe to repeat: they only read data from the exchange
+IDEMPOTENT_OPERATIONS = frozenset({
+    'fetch-markets',
+    'fetch-order-book',
+    'fetch-order-book-columns',
+    'ticker',
+    'fetch-ohlcv',
+    'fetch-ohlcv-columns',
+    'fetch-trades',
+    'fetch-volume-fees',
+    'fetch-open-orders',
+    'fetch-closed-orders',
+    'fetch-my-trades',
+    'fetch-balance',
+    'fetch-order',
+    'fetch-history',
+    'fetch-history-columns',
+})
+
+
+class RetryPolicy(NamedTuple):
+    """
+    Retry policy for idempotent (read-only) operations: exponential backoff with jitter.
+
+    Operations are repeated on HTTP statuses from `statuses` and on connection errors or timeouts.
+    Delay before attempt N (starting from 1) is random in range
+    [(1 - jitter) * D, D] where D = min(max_backoff, backoff * 2 ** (N - 1)). Retry-After header
+    from the server overrides the delay if it is longer.
+    Operations that change state (create order, cancel order) are never repeated.
+    """
+    attempts: int = 3  #: maximum number of attempts including the first one
+    backoff: float = 0.1  #: base delay in seconds
+    max_backoff: float = 5  #: maximum delay in seconds between attempts
+    jitter: float = 1  #: randomized part of the delay (0 - no jitter, 1 - full jitter)
+    max_elapsed: float = 30  #: total time budget in seconds for all attempts and delays
+    statuses: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})  #: HTTP statuses to retry
+
+    def delay(self, attempt: int, elapsed: float, retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        Calculate delay before next attempt
+
+        :param attempt: number of failed attempts
+        :param elapsed: time in seconds since the first attempt
+        :param retry_after: delay in seconds requested by the server
+        :return: delay in seconds or None if no more attempts allowed
+        """
+        if attempt >= self.attempts:
+            return None
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        delay -= delay * self.jitter * random.random()
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if elapsed + delay > self.max_elapsed:
+            return None
+        return delay
@@ -0,0 +1,38 @@
+import hashlib
+import hmac
+from typing import Dict
+
+
+class Signer:
+    """
+    Signs payloads of authorized requests by HMAC-SHA256 of the API secret.
+
+    Keyed HMAC state is prepared once and copied for each request, token prefix of the header
+    is cached, so signing costs one hash of the payload.
+    """
+
+    header = 'X-Api-Signed-Token'  #: name of HTTP header with token and signature
+
+    def __init__(self, token: str, secret: str):
+        self.__template = hmac.new(secret.encode(), digestmod=hashlib.sha256)
+        self.__prefix = token + ','
+
+    def signature(self, payload: bytes) -> str:
+        """
+        Sign payload
+
+        :param payload: request body
+        :return: hex-encoded signature
+        """
+        signer = self.__template.copy()
+        signer.update(payload)
+        return signer.hexdigest()
+
+    def headers(self, payload: bytes) -> Dict[str, str]:
+        """
+        Build authorization headers for the request
+
+        :param payload: request body
+        :return: HTTP headers with token and signature
+        """
+        return {self.header: self.__prefix + self.signature(payload)}
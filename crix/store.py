@@ -0,0 +1,182 @@
+import os
+import time
+from datetime import datetime
+from typing import Iterable, Optional
+
+from .columnar import np, _require_numpy
+from .models import Resolution, Ticker
+
+#: record of one K-line in the store files: open time in epoch milliseconds, prices and volume (in base)
+CANDLE_DTYPE = np.dtype([
+    ('open_time', '<i8'),
+    ('open', '<f8'),
+    ('close', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('volume', '<f8'),
+]) if np is not None else None
+
+
+class CandleStore:
+    """
+    Local append-only store of closed K-lines: one file of fixed-size records (`CANDLE_DTYPE`) per symbol
+    and resolution in the directory. Files are memory-mapped on read, so reading returns NumPy views
+    without loading candles into Python objects.
+
+    `sync` downloads only K-lines newer than the last stored one.
+
+    .. highlight:: python
+    .. code-block:: python
+
+        from datetime import datetime
+        import crix
+        from crix.models import Resolution
+        from crix.store import CandleStore
+
+        store = CandleStore('./candles')
+        store.sync(crix.Client(env='prod'), 'BTC_USDT', Resolution.one_minute, datetime(2019, 1, 1), concurrency=4)
+        candles = store.read('BTC_USDT', Resolution.one_minute, start=datetime(2019, 6, 1))
+        print(candles['close'].mean())
+
+    Requires numpy.
+    """
+
+    def __init__(self, directory: str):
+        _require_numpy('candle store')
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, symbol: str, resolution: Resolution) -> str:
+        """
+        File of K-lines for symbol and resolution
+        """
+        return os.path.join(self.directory, '{}-{}.candles'.format(symbol, resolution.value))
+
+    def read(self, symbol: str, resolution: Resolution, start: Optional[datetime] = None,
+             end: Optional[datetime] = None) -> 'np.ndarray':
+        """
+        Get stored K-lines as read-only structured array (view of the memory-mapped file) sorted by open time
+
+        :param symbol: K-Line symbol name
+        :param resolution: K-line resolution
+        :param start: earliest open time (inclusive, if not defined - from the first K-line)
+        :param end: latest open time (inclusive, if not defined - up to the last K-line)
+        :return: array of `CANDLE_DTYPE` records
+        """
+        path = self.path(symbol, resolution)
+        size = os.path.getsize(path) // CANDLE_DTYPE.itemsize if os.path.exists(path) else 0
+        if size == 0:
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        # incomplete trailing record (interrupted append) is ignored
+        candles = np.memmap(path, dtype=CANDLE_DTYPE, mode='r', shape=(size,))
+        first, last = 0, size
+        if start is not None:
+            first = int(np.searchsorted(candles['open_time'], int(start.timestamp() * 1000), side='left'))
+        if end is not None:
+            last = int(np.searchsorted(candles['open_time'], int(end.timestamp() * 1000), side='right'))
+        return candles[first:last]
+
+    def last_time(self, symbol: str, resolution: Resolution) -> Optional[datetime]:
+        """
+        Open time of the last stored K-line or None if nothing stored
+        """
+        candles = self.read(symbol, resolution)
+        if not len(candles):
+            return None
+        return datetime.fromtimestamp(int(candles['open_time'][-1]) / 1000)
+
+    def append(self, symbol: str, resolution: Resolution, candles: Iterable[Ticker]) -> int:
+        """
+        Store K-lines newer than the last stored one
+
+        :param symbol: K-Line symbol name
+        :param resolution: K-line resolution
+        :param candles: K-lines sorted by open time
+        :return: number of stored K-lines
+        """
+        stored = self.read(symbol, resolution)
+        last = int(stored['open_time'][-1]) if len(stored) else None
+        del stored
+        records = []
+        for candle in candles:
+            open_time = int(candle.open_time.timestamp() * 1000)
+            if last is not None and open_time <= last:
+                continue
+            records.append((open_time, candle.open, candle.close, candle.high, candle.low, candle.volume))
+            last = open_time
+        if not records:
+            return 0
+        path = self.path(symbol, resolution)
+        with open(path, 'ab') as file:
+            # drop incomplete trailing record left by interrupted append
+            file.truncate(file.tell() - file.tell() % CANDLE_DTYPE.itemsize)
+            np.array(records, dtype=CANDLE_DTYPE).tofile(file)
+        return len(records)
+
+    def sync(self, client, symbol: str, resolution: Resolution, start: datetime, limit: int = 1000,
+             concurrency: int = 1) -> int:
+        """
+        Download and store closed K-lines after the last stored one (or from `start` if nothing stored)
+
+        :param client: synchronous client (crix.Client or crix.AuthorizedClient)
+        :param symbol: K-Line symbol name
+        :param resolution: K-line resolution
+        :param start: earliest interesting time for the first sync
+        :param limit: maximum number of K-lines per request
+        :param concurrency: maximum number of simultaneous requests
+        :return: number of stored K-lines
+        """
+        begin, end = self.__range(symbol, resolution, start)
+        if begin > end:
+            return 0
+        stored = 0
+        batch = []
+        now = time.time()
+        for candle in client.fetch_ohlcv_range(symbol, begin, end, resolution, limit, concurrency):
+            if not self.__is_closed(candle, resolution, now):
+                continue
+            batch.append(candle)
+            # store by batches to keep progress of a long download
+            if len(batch) >= limit:
+                stored += self.append(symbol, resolution, batch)
+                batch = []
+        return stored + self.append(symbol, resolution, batch)
+
+    async def async_sync(self, client, symbol: str, resolution: Resolution, start: datetime, limit: int = 1000,
+                         concurrency: int = 1) -> int:
+        """
+        Download and store closed K-lines after the last stored one (asyncio version)
+
+        :param client: asynchronous client (crix.AsyncClient or crix.AsyncAuthorizedClient)
+        :param symbol: K-Line symbol name
+        :param resolution: K-line resolution
+        :param start: earliest interesting time for the first sync
+        :param limit: maximum number of K-lines per request
+        :param concurrency: maximum number of simultaneous requests
+        :return: number of stored K-lines
+        """
+        begin, end = self.__range(symbol, resolution, start)
+        if begin > end:
+            return 0
+        stored = 0
+        batch = []
+        now = time.time()
+        async for candle in client.fetch_ohlcv_range(symbol, begin, end, resolution, limit, concurrency):
+            if not self.__is_closed(candle, resolution, now):
+                continue
+            batch.append(candle)
+            if len(batch) >= limit:
+                stored += self.append(symbol, resolution, batch)
+                batch = []
+        return stored + self.append(symbol, resolution, batch)
+
+    def __range(self, symbol: str, resolution: Resolution, start: datetime):
+        last = self.last_time(symbol, resolution)
+        begin = start if last is None else max(start, last + resolution.interval)
+        # the latest candle is still open
+        end = datetime.fromtimestamp(time.time()) - resolution.interval
+        return begin, end
+
+    @staticmethod
+    def __is_closed(candle: Ticker, resolution: Resolution, now: float) -> bool:
+        return candle.open_time.timestamp() + resolution.interval.total_seconds() <= now
@@ -0,0 +1,193 @@
+import codecs
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, List, Optional
+
+_WHITESPACE = ' \t\n\r'
+_NUMBER_START = '-0123456789'
+_NUMBER_CHARS = '0123456789+-.eE'
+
+#: size of response body chunks read by clients in streaming mode
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class JSONArrayParser:
+    """
+    Incremental parser of a JSON array: elements are returned by `feed` as soon as they are complete,
+    without waiting for the whole document.
+
+    The array is either the document itself (`key` is None) or a value of the `key` field of the top-level
+    object (ex: `{"trades": [...]}` with key 'trades'). Other fields of the object are skipped. `null` instead
+    of the array is treated as an empty array.
+    """
+
+    def __init__(self, key: Optional[str] = None):
+        self.key = key
+        self.done = False  #: array is completely parsed
+        self.__decoder = json.JSONDecoder()
+        self.__text = codecs.getincrementaldecoder('utf-8')()
+        self.__buffer = ''
+        self.__state = 'document' if key is None else 'object'
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """
+        Parse next chunk of the document
+
+        :param chunk: next part of UTF-8 encoded document
+        :return: elements of the array completed by the chunk
+        """
+        self.__buffer += self.__text.decode(chunk)
+        elements = []
+        pos = self.__parse(0, elements)
+        self.__buffer = self.__buffer[pos:]
+        return elements
+
+    def close(self):
+        """
+        Check that the document ended after the array
+
+        :raise ValueError: document is truncated
+        """
+        self.__buffer += self.__text.decode(b'', final=True)
+        if not self.done:
+            raise ValueError('incomplete JSON document: {!r}'.format(self.__buffer[:100]))
+
+    def __skip(self, pos: int) -> int:
+        while pos < len(self.__buffer) and self.__buffer[pos] in _WHITESPACE:
+            pos += 1
+        return pos
+
+    def __value(self, pos: int):
+        """
+        Decode value starting at pos. Returns None if the value could be incomplete yet
+        """
+        try:
+            value, end = self.__decoder.raw_decode(self.__buffer, pos)
+        except json.JSONDecodeError:
+            return None
+        # numbers and literals at the end of the buffer could continue in the next chunk
+        if end >= len(self.__buffer):
+            return None
+        # number could be decoded by its prefix (ex: `2` of `2.` or `1` of `1e`) while the rest is not received
+        if self.__buffer[pos] in _NUMBER_START:
+            rest = end
+            while rest < len(self.__buffer) and self.__buffer[rest] in _NUMBER_CHARS:
+                rest += 1
+            if rest >= len(self.__buffer):
+                return None
+        return value, end
+
+    def __parse(self, pos: int, elements: List[Any]) -> int:
+        buffer = self.__buffer
+        while not self.done:
+            pos = self.__skip(pos)
+            if pos >= len(buffer):
+                return pos
+            char = buffer[pos]
+            state = self.__state
+            if state == 'object':
+                if char != '{':
+                    raise ValueError('expected JSON object, got {!r}'.format(char))
+                pos += 1
+                self.__state = 'field'
+            elif state == 'field':
+                if char == ',':
+                    pos += 1
+                    continue
+                if char == '}':
+                    raise ValueError('field {!r} not found'.format(self.key))
+                # key, colon and value are consumed at once (value of the key could be the array)
+                decoded = self.__value(pos)
+                if decoded is None:
+                    return pos
+                name, end = decoded
+                end = self.__skip(end)
+                if end >= len(buffer):
+                    return pos
+                if buffer[end] != ':':
+                    raise ValueError('expected colon, got {!r}'.format(buffer[end]))
+                end = self.__skip(end + 1)
+                if end >= len(buffer):
+                    return pos
+                if name == self.key:
+                    pos = end
+                    self.__state = 'document'
+                    continue
+                decoded = self.__value(end)
+                if decoded is None:
+                    return pos
+                pos = decoded[1]
+            elif state == 'document':
+                if buffer.startswith('null', pos):
+                    pos += 4
+                    self.done = True
+                elif char == '[':
+                    pos += 1
+                    self.__state = 'first'
+                elif len(buffer) - pos < 4 and 'null'.startswith(buffer[pos:]):
+                    return pos
+                else:
+                    raise ValueError('expected JSON array, got {!r}'.format(char))
+            else:
+                if char == ']':
+                    pos += 1
+                    self.done = True
+                    continue
+                if state == 'next':
+                    if char != ',':
+                        raise ValueError('expected comma, got {!r}'.format(char))
+                    pos = self.__skip(pos + 1)
+                    if pos >= len(buffer):
+                        self.__state = 'first'
+                        return pos
+                decoded = self.__value(pos)
+                if decoded is None:
+                    # keep the comma consumed: the element starts at pos
+                    self.__state = 'first'
+                    return pos
+                value, pos = decoded
+                elements.append(value)
+                self.__state = 'next'
+        return pos
+
+
+def iter_json_array(chunks: Iterable[bytes], key: Optional[str] = None) -> Iterator[Any]:
+    """
+    Yield elements of JSON array from chunks of the document as soon as they are parsed
+
+    .. highlight:: python
+    .. code-block:: python
+
+        import requests
+        from crix.streaming import iter_json_array
+
+        with requests.get(url, stream=True) as response:
+            for trade in iter_json_array(response.iter_content(65536), key='trades'):
+                print(trade['id'])
+
+    :param chunks: UTF-8 encoded document by parts
+    :param key: field of the top-level object with the array (None - document is the array)
+    :return: iterator of decoded elements
+    """
+    parser = JSONArrayParser(key)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.done:
+            return
+    parser.close()
+
+
+async def aiter_json_array(chunks: AsyncIterable[bytes], key: Optional[str] = None) -> AsyncIterator[Any]:
+    """
+    Yield elements of JSON array from chunks of the document as soon as they are parsed (asyncio version)
+
+    :param chunks: UTF-8 encoded document by parts (ex: `response.content.iter_chunked(65536)`)
+    :param key: field of the top-level object with the array (None - document is the array)
+    :return: async iterator of decoded elements
+    """
+    parser = JSONArrayParser(key)
+    async for chunk in chunks:
+        for element in parser.feed(chunk):
+            yield element
+        if parser.done:
+            return
+    parser.close()
@@ -0,0 +1,132 @@
+import json
+import os
+from typing import NamedTuple, Optional, Dict, List, Iterable
+
+from .models import Trade
+
+
+class TradeCursor(NamedTuple):
+    """
+    Sync position of one symbol
+    """
+    trade_id: int = 0  #: highest seen id of the user trade
+    market_id: int = 0  #: last id of the symbol trades (by 24h ticker) at the moment of the latest sync
+
+
+class TradeSync:
+    """
+    Incremental sync of the user trades: returns only trades which were not returned before.
+
+    For each symbol the highest seen trade id (watermark) is kept and persisted to the JSON file at `path`
+    (if defined). Symbols are requested only if the last trade id of the symbol in 24h tickers has changed since
+    the previous sync. Trades are requested with a small `limit` which is doubled (up to `max_limit`)
+    while the response doesn't reach the watermark, so each sync costs close to the number of new trades.
+
+    .. highlight:: python
+    .. code-block:: python
+
+        import os
+        import crix
+        from crix.tradesync import TradeSync
+
+        client = crix.AuthorizedClient(token=os.getenv('TOKEN'), secret=os.getenv('SECRET'), workers=4)
+        sync = TradeSync('trades-cursor.json')
+        for trade in sync.sync(client):
+            print(trade.symbol_name, trade.id)
+    """
+
+    def __init__(self, path: Optional[str] = None, limit: int = 50, max_limit: int = 1000):
+        self.path = path
+        self.limit = limit
+        self.max_limit = max_limit
+        self.cursors: Dict[str, TradeCursor] = {}
+        if path is not None and os.path.exists(path):
+            with open(path, encoding='utf-8') as file:
+                self.cursors = {symbol: TradeCursor(*cursor) for symbol, cursor in json.load(file).items()}
+
+    def save(self):
+        """
+        Persist cursors to the file (atomically)
+        """
+        if self.path is None:
+            return
+        temp = self.path + '.tmp'
+        with open(temp, 'w', encoding='utf-8') as file:
+            json.dump({symbol: list(cursor) for symbol, cursor in self.cursors.items()}, file)
+        os.replace(temp, self.path)
+
+    def sync(self, client, *symbols: str) -> List[Trade]:
+        """
+        Get new trades of the user and persist cursors
+
+        :param client: synchronous authorized client (crix.AuthorizedClient)
+        :param symbols: symbols to sync (if not specified - all symbols with trades in 24h tickers)
+        :return: new trades grouped by symbol and sorted by id
+        """
+        pending = self.__active(client.fetch_ticker(), symbols)
+        limit = self.limit
+        result = []
+        while pending:
+            trades = client.fetch_my_trades(*pending, limit=limit)
+            pending = self.__accept(trades, pending, limit, result)
+            limit = min(limit * 2, self.max_limit)
+        self.save()
+        return result
+
+    async def async_sync(self, client, *symbols: str, concurrency: int = 1) -> List[Trade]:
+        """
+        Get new trades of the user and persist cursors (asyncio version)
+
+        :param client: asynchronous authorized client (crix.AsyncAuthorizedClient)
+        :param symbols: symbols to sync (if not specified - all symbols with trades in 24h tickers)
+        :param concurrency: maximum number of simultaneous requests
+        :return: new trades grouped by symbol and sorted by id
+        """
+        pending = self.__active(await client.fetch_ticker(), symbols)
+        limit = self.limit
+        result = []
+        while pending:
+            trades = [trade async for trade in client.fetch_my_trades(*pending, limit=limit,
+                                                                      concurrency=concurrency)]
+            pending = self.__accept(trades, pending, limit, result)
+            limit = min(limit * 2, self.max_limit)
+        self.save()
+        return result
+
+    def __active(self, tickers: Iterable, symbols: Iterable[str]) -> Dict[str, int]:
+        """
+        Symbols with new market trades since the previous sync and their last trade ids
+        """
+        last_ids = {ticker.symbol_name: ticker.last_id for ticker in tickers}
+        if not symbols:
+            symbols = last_ids.keys()
+        active = {}
+        for symbol in symbols:
+            # symbols without ticker or without cursor (never synced, older trades could exist) are always requested
+            last_id = last_ids.get(symbol)
+            cursor = self.cursors.get(symbol)
+            if last_id is None or cursor is None or last_id > cursor.market_id:
+                active[symbol] = last_id or 0
+        return active
+
+    def __accept(self, trades: Iterable[Trade], pending: Dict[str, int], limit: int,
+                 result: List[Trade]) -> Dict[str, int]:
+        """
+        Collect new trades and move cursors. Returns symbols which should be requested with a bigger limit
+        """
+        by_symbol: Dict[str, List[Trade]] = {symbol: [] for symbol in pending}
+        for trade in trades:
+            by_symbol.setdefault(trade.symbol_name, []).append(trade)
+        retry = {}
+        for symbol, received in by_symbol.items():
+            cursor = self.cursors.get(symbol, TradeCursor())
+            fresh = sorted((trade for trade in received if trade.id > cursor.trade_id), key=lambda trade: trade.id)
+            # all trades are new and the limit is reached: older new trades could be missed
+            if len(fresh) == len(received) >= limit and limit < self.max_limit:
+                retry[symbol] = pending[symbol]
+                continue
+            result.extend(fresh)
+            trade_id = fresh[-1].id if fresh else cursor.trade_id
+            market_id = max(pending.get(symbol, 0), cursor.market_id)
+            self.cursors[symbol] = TradeCursor(trade_id=trade_id, market_id=market_id)
+        return retry
@@ -0,0 +1,105 @@
+from typing import NamedTuple, Optional
+
+import requests
+from requests.adapters import HTTPAdapter, DEFAULT_POOLSIZE
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+
+class _TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    HTTP adapter with default timeout for requests without explicit one
+    """
+
+    def __init__(self, timeout=None, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):  # pylint: disable=arguments-differ
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+class TransportConfig(NamedTuple):
+    """
+    Connection pooling and timeouts settings for HTTP sessions of clients.
+
+    One session (and one connection pool) could be shared across many clients instances:
+
+    .. highlight:: python
+    .. code-block:: python
+
+        import crix
+        from crix.transport import TransportConfig
+
+        session = TransportConfig(pool_per_host=32, read_timeout=10).session()
+        clients = [crix.AuthorizedClient(token, secret, session=session) for token, secret in credentials]
+
+    Some settings are supported only by aiohttp:
+
+    - `pool_size` - requests keeps separate pool for each host
+    - `keep_alive` - requests keeps idle connections until they closed by the server
+    - `dns_ttl` - requests resolves host for each new connection
+    """
+    pool_size: int = 100  #: maximum number of simultaneous connections
+    pool_per_host: int = 10  #: maximum number of simultaneous connections to the same host
+    pool_block: bool = False  #: wait for free connection instead of opening extra one (requests only)
+    keep_alive: float = 15  #: seconds to keep idle connection open
+    dns_ttl: Optional[int] = 10  #: seconds to cache resolved host names (None - disable cache)
+    connect_timeout: Optional[float] = None  #: seconds to establish connection (None - no limit)
+    read_timeout: Optional[float] = None  #: seconds to wait for data from socket (None - no limit)
+    total_timeout: Optional[float] = None  #: seconds for the whole request (aiohttp only, None - no limit)
+
+    def adapter(self) -> HTTPAdapter:
+        """
+        Build requests adapter with configured pool size and timeouts
+        """
+        timeout = None
+        if self.connect_timeout is not None or self.read_timeout is not None:
+            timeout = (self.connect_timeout, self.read_timeout)
+        # pool_connections is the number of cached per-host pools, not a connection limit
+        return _TimeoutHTTPAdapter(timeout=timeout,
+                                   pool_connections=DEFAULT_POOLSIZE,
+                                   pool_maxsize=self.pool_per_host,
+                                   pool_block=self.pool_block)
+
+    def session(self) -> requests.Session:
+        """
+        Create new requests session for synchronous clients
+        """
+        session = requests.Session()
+        adapter = self.adapter()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def connector(self) -> TCPConnector:
+        """
+        Create new aiohttp connector (connection pool)
+        """
+        return TCPConnector(limit=self.pool_size,
+                            limit_per_host=self.pool_per_host,
+                            keepalive_timeout=self.keep_alive,
+                            use_dns_cache=self.dns_ttl is not None,
+                            ttl_dns_cache=self.dns_ttl)
+
+    def timeout(self) -> ClientTimeout:
+        """
+        Build aiohttp timeouts settings
+        """
+        return ClientTimeout(total=self.total_timeout,
+                             connect=self.connect_timeout,
+                             sock_read=self.read_timeout)
+
+    def async_session(self, connector: Optional[TCPConnector] = None) -> ClientSession:
+        """
+        Create new aiohttp session for asynchronous clients.
+
+        If `connector` provided, it will be shared and not closed together with the session.
+
+        :param connector: existent connection pool
+        :return: aiohttp session
+        """
+        if connector is None:
+            return ClientSession(connector=self.connector(), timeout=self.timeout())
+        return ClientSession(connector=connector, connector_owner=False, timeout=self.timeout())
@@ -0,0 +1,136 @@
+from decimal import Decimal, ROUND_FLOOR, ROUND_CEILING
+from typing import Iterable, List, Tuple, Dict, Optional
+
+from .models import Symbol, NewOrder, OrderType
+
+#: order types with limit price
+PRICED_TYPES = frozenset({OrderType.limit, OrderType.stop_loss_limit, OrderType.stop_loss_range,
+                          OrderType.take_profit_limit})
+
+
+class OrderValidationError(ValueError):
+    """
+    Order violates rules of the symbol
+    """
+
+    order: NewOrder  #: invalid order
+    reasons: Tuple[str, ...]  #: violated rules
+
+    def __init__(self, order: NewOrder, reasons: Tuple[str, ...]):
+        self.order = order
+        self.reasons = reasons
+        super().__init__('invalid order for {}: {}'.format(order.symbol, '; '.join(reasons)))
+
+
+def _snap(value: Decimal, tick: Decimal, rounding: str) -> Decimal:
+    if not tick:
+        return value
+    return (value / tick).to_integral_value(rounding=rounding) * tick
+
+
+class OrderValidator:
+    """
+    Local pre-trade check of new orders against symbols rules (lot and price limits, ticks, minimal notional).
+    Optionally price and quantity are snapped to the tick grid: price of buy orders is rounded down,
+    price of sell orders - up (never worse for the order owner), quantity is rounded down.
+
+    .. highlight:: python
+    .. code-block:: python
+
+        from crix.validation import OrderValidator
+
+        validator = OrderValidator(client.fetch_markets())
+        order = validator.validate(NewOrder.limit('BTC_USDT', True, '3500.123456', '0.1234567'), snap=True)
+        client.create_order(order)
+    """
+
+    def __init__(self, markets: Iterable[Symbol]):
+        self.__symbols: Dict[str, Symbol] = {symbol.name: symbol for symbol in markets}
+
+    def snap(self, order: NewOrder) -> NewOrder:
+        """
+        Round price, stop price and quantity of the order to the tick grid of the symbol
+
+        :param order: new order
+        :return: new order with rounded values (same order if nothing changed or symbol is unknown)
+        """
+        symbol = self.__symbols.get(order.symbol)
+        if symbol is None:
+            return order
+        rounding = ROUND_FLOOR if order.is_buy else ROUND_CEILING
+        price = _snap(order.price, symbol.tick_price, rounding) if order.type in PRICED_TYPES else order.price
+        stop_price = order.stop_price
+        if stop_price is not None:
+            stop_price = _snap(stop_price, symbol.tick_price, rounding)
+        quantity = _snap(order.quantity, symbol.tick_lot, ROUND_FLOOR)
+        if price == order.price and quantity == order.quantity and stop_price == order.stop_price:
+            return order
+        return order._replace(price=price, quantity=quantity, stop_price=stop_price)
+
+    def check(self, order: NewOrder) -> Tuple[str, ...]:
+        """
+        Find violated rules of the symbol
+
+        :param order: new order
+        :return: descriptions of violated rules (empty if order is valid)
+        """
+        symbol: Optional[Symbol] = self.__symbols.get(order.symbol)
+        if symbol is None:
+            return ('unknown symbol',)
+        reasons = []
+        if not symbol.is_trading:
+            reasons.append('trading is disabled')
+        quantity = order.quantity
+        if quantity < symbol.min_lot:
+            reasons.append('quantity {} is less than {}'.format(quantity, symbol.min_lot))
+        if symbol.max_lot and quantity > symbol.max_lot:
+            reasons.append('quantity {} is more than {}'.format(quantity, symbol.max_lot))
+        if symbol.tick_lot and quantity % symbol.tick_lot:
+            reasons.append('quantity {} is not multiple of {}'.format(quantity, symbol.tick_lot))
+        if order.type in PRICED_TYPES:
+            price = order.price
+            if price < symbol.min_price:
+                reasons.append('price {} is less than {}'.format(price, symbol.min_price))
+            if symbol.max_price and price > symbol.max_price:
+                reasons.append('price {} is more than {}'.format(price, symbol.max_price))
+            if symbol.tick_price and price % symbol.tick_price:
+                reasons.append('price {} is not multiple of {}'.format(price, symbol.tick_price))
+            if price * quantity < symbol.min_notional:
+                reasons.append('notional {} is less than {}'.format(price * quantity, symbol.min_notional))
+        if order.stop_price is not None and symbol.tick_price and order.stop_price % symbol.tick_price:
+            reasons.append('stop price {} is not multiple of {}'.format(order.stop_price, symbol.tick_price))
+        return tuple(reasons)
+
+    def validate(self, order: NewOrder, snap: bool = False) -> NewOrder:
+        """
+        Check the order (snapped to the tick grid if `snap`)
+
+        :param order: new order
+        :param snap: round price and quantity to the tick grid before checks
+        :return: checked order
+        :raise OrderValidationError: order violates rules of the symbol
+        """
+        if snap:
+            order = self.snap(order)
+        reasons = self.check(order)
+        if reasons:
+            raise OrderValidationError(order, reasons)
+        return order
+
+    def validate_batch(self, orders: Iterable[NewOrder],
+                       snap: bool = False) -> Tuple[List[NewOrder], List[OrderValidationError]]:
+        """
+        Check several orders without stopping on the first invalid one
+
+        :param orders: new orders
+        :param snap: round prices and quantities to the tick grid before checks
+        :return: valid orders and errors of invalid ones
+        """
+        valid = []
+        errors = []
+        for order in orders:
+            try:
+                valid.append(self.validate(order, snap))
+            except OrderValidationError as err:
+                errors.append(err)
+        return valid, errors
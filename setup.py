@@ -20,6 +20,10 @@ setuptools.setup(
     url='https://github.com/blockwise/crix-client-py',
     packages=setuptools.find_packages(),
     install_requires=install_reqs,
+    extras_require={
+        'fast': ['orjson'],
+        'numpy': ['numpy'],
+    },
     setup_requires=['wheel'],
     classifiers=[
         'Programming Language :: Python :: 3.6',
@@ -0,0 +1,107 @@
+import json
+import threading
+from typing import Callable, Optional, Tuple, Any
+
+
+def symbol_json(name: str, base: str, quote: str, **fields) -> dict:
+    info = {'symbolName': name, 'base': base, 'basePrecision': 8, 'quote': quote, 'quotePrecision': 8, 'desc': '',
+            'strLevelAggregation': ['0.1'], 'minLot': '0.001', 'maxLot': '1000', 'minPrice': '0.01',
+            'maxPrice': '100000', 'minNotional': '1', 'tickLot': '0.001', 'tickPrice': '0.01', 'trading': True,
+            'makerFee': '0.001', 'takerFee': '0.002'}
+    info.update(fields)
+    return info
+
+
+def order_json(order_id: int, symbol: str) -> dict:
+    return {'orderId': order_id, 'userId': 1, 'type': 0, 'symbolName': symbol, 'isBuy': True, 'quantity': '1',
+            'price': '10', 'stopPrice': None, 'filledQuantity': '0', 'timeInForce': 0, 'expireTime': 0, 'status': 0,
+            'createdAt': 1550000000000, 'lastUpdateAt': 1550000000000}
+
+
+def account_json(account_id: int, balance: str) -> dict:
+    return {'id': account_id, 'userId': account_id, 'balance': balance, 'lockedBalance': '0',
+            'currencyName': 'BTC', 'depositAddress': ''}
+
+
+class FakeResponse:
+    def __init__(self, status: int, data: Any):
+        self.status_code = status
+        self.headers = {}
+        self.content = json.dumps(data).encode() if status == 200 else b''
+        self.text = '' if status == 200 else str(data)
+
+
+class FakeSession:
+    """
+    Replacement of requests session: `handler` gets URL, decoded `req` of the body and headers and returns
+    HTTP status and response data
+    """
+
+    def __init__(self, handler: Callable[[str, Optional[dict], dict], Tuple[int, Any]]):
+        self.handler = handler
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def request(self, method, url, stream=False, **kwargs):  # pylint: disable=unused-argument
+        body = kwargs.get('data')
+        req = json.loads(body).get('req') if body else None
+        with self.lock:
+            self.requests.append((url, req))
+        return FakeResponse(*self.handler(url, req, kwargs.get('headers') or {}))
+
+    def close(self):
+        pass
+
+
+class FakeAsyncResponse:
+    def __init__(self, status: int, data: Any):
+        self.status = status
+        self.headers = {}
+        self.body = json.dumps(data).encode() if status == 200 else str(data).encode()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    async def read(self) -> bytes:
+        return self.body
+
+    async def text(self) -> str:
+        return self.body.decode()
+
+
+class FakeAsyncSession:
+    """
+    Replacement of aiohttp session: `handler` is a coroutine function with the same arguments and result
+    as the handler of `FakeSession`
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+
+    def request(self, method, url, **kwargs):  # pylint: disable=unused-argument
+        return _FakeAsyncRequest(self, url, kwargs)
+
+    async def close(self):
+        pass
+
+
+class _FakeAsyncRequest:
+    def __init__(self, session: FakeAsyncSession, url: str, kwargs: dict):
+        self.session = session
+        self.url = url
+        self.kwargs = kwargs
+        self.response = None
+
+    async def __aenter__(self):
+        body = self.kwargs.get('data')
+        req = json.loads(body).get('req') if body else None
+        self.session.requests.append((self.url, req))
+        self.response = FakeAsyncResponse(*await self.session.handler(self.url, req, self.kwargs.get('headers') or {}))
+        return self.response
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
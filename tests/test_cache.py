@@ -0,0 +1,37 @@
+import crix
+from crix.cache import ResponseCache
+
+from fakes import FakeSession, symbol_json, account_json
+
+
+def test_cache_shared_between_environments():
+    def handler(url, req, headers):
+        if url.startswith('https://crix.io'):
+            return 200, {'symbol': [symbol_json('BTC_USDT', 'BTC', 'USDT')]}
+        return 200, {'symbol': [symbol_json('ETH_BTC', 'ETH', 'BTC')]}
+
+    cache = ResponseCache()
+    session = FakeSession(handler)
+    mvp = crix.Client(env='mvp', cache=cache, session=session)
+    prod = crix.Client(env='prod', cache=cache, session=session)
+    assert mvp.fetch_markets().names == ('ETH_BTC',)
+    assert prod.fetch_markets().names == ('BTC_USDT',)
+    # both environments are cached separately
+    assert mvp.fetch_markets().names == ('ETH_BTC',)
+    assert prod.fetch_markets().names == ('BTC_USDT',)
+    assert len(session.requests) == 2
+
+
+def test_cache_shared_between_accounts():
+    def handler(url, req, headers):
+        balance = '1' if headers['X-Api-Signed-Token'].startswith('alice,') else '2'
+        return 200, {'accounts': [account_json(1, balance)]}
+
+    cache = ResponseCache(ttl={'fetch-balance': 60})
+    session = FakeSession(handler)
+    alice = crix.AuthorizedClient('alice', 'secret-a', cache=cache, session=session)
+    bob = crix.AuthorizedClient('bob', 'secret-b', cache=cache, session=session)
+    assert alice.fetch_balance()[0].balance == 1
+    assert bob.fetch_balance()[0].balance == 2
+    assert alice.fetch_balance()[0].balance == 1
+    assert len(session.requests) == 2
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import time
+
+import crix
+from crix.client import APIError
+
+from fakes import FakeSession, FakeAsyncSession, order_json
+
+
+class Exchange:
+    """
+    Open orders: 3 per symbol; scan of `BAD` fails, cancel of order 1 of `B` fails
+    """
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def respond(self, url, req):
+        if url.endswith('/user/orders/open'):
+            if req['symbolName'] == 'BAD':
+                return 500, 'scan failed'
+            return 200, {'orders': [order_json(i, req['symbolName']) for i in range(3)]}
+        if req['symbolName'] == 'B' and req['orderId'] == 1:
+            return 400, 'cancel failed'
+        return 200, order_json(req['orderId'], req['symbolName'])
+
+    def enter(self, url):
+        if url.endswith('/user/order/cancel'):
+            with self.lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+
+    def leave(self, url):
+        if url.endswith('/user/order/cancel'):
+            with self.lock:
+                self.active -= 1
+
+    def handler(self, url, req, headers):
+        self.enter(url)
+        try:
+            time.sleep(0.01)
+            return self.respond(url, req)
+        finally:
+            self.leave(url)
+
+    async def async_handler(self, url, req, headers):
+        self.enter(url)
+        try:
+            await asyncio.sleep(0.01)
+            return self.respond(url, req)
+        finally:
+            self.leave(url)
+
+
+def check_results(results):
+    cancels = [result for result in results if not isinstance(result.request, str)]
+    scans = [result for result in results if isinstance(result.request, str)]
+    # a failed scan doesn't stop cancellation of other symbols
+    assert sorted((result.request.symbol_name, result.request.id) for result in cancels) == \
+        [(symbol, i) for symbol in ('A', 'B', 'C') for i in range(3)]
+    # a failed cancel doesn't abort others
+    failed = [(result.request.symbol_name, result.request.id) for result in cancels if not result.ok]
+    assert failed == [('B', 1)]
+    assert all(result.order.id == result.request.id for result in cancels if result.ok)
+    # failed scan is reported with the symbol as request
+    assert len(scans) == 1
+    assert scans[0].request == 'BAD'
+    assert not scans[0].ok and scans[0].order is None
+    assert isinstance(scans[0].error, APIError)
+
+
+def test_cancel_all():
+    exchange = Exchange()
+    with crix.AuthorizedClient('token', 'secret', session=FakeSession(exchange.handler), workers=2) as client:
+        results = client.cancel_all('A', 'BAD', 'B', 'C', concurrency=2)
+    check_results(results)
+    assert 1 <= exchange.max_active <= 2
+
+
+def test_async_cancel_all():
+    exchange = Exchange()
+
+    async def run():
+        async with crix.AsyncAuthorizedClient('token', 'secret',
+                                              session=FakeAsyncSession(exchange.async_handler)) as client:
+            return await client.cancel_all('A', 'BAD', 'B', 'C', concurrency=2)
+
+    check_results(asyncio.run(run()))
+    assert 1 <= exchange.max_active <= 2
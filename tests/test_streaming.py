@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from crix.streaming import JSONArrayParser, iter_json_array, aiter_json_array
+
+
+def chunked(document: bytes, size: int):
+    return [document[i:i + size] for i in range(0, len(document), size)]
+
+
+NUMERIC_DOCUMENTS = [
+    (b'[1, 2.5, 3]', [1, 2.5, 3]),
+    (b'[-1,-2.25e3,1E-2,0,10]', [-1, -2250.0, 0.01, 0, 10]),
+    (b'[ 12345678901234567890 , 0.000001 ]', [12345678901234567890, 0.000001]),
+    (b'[1e+2,2E-1]', [100.0, 0.2]),
+]
+
+
+@pytest.mark.parametrize('document,expected', NUMERIC_DOCUMENTS)
+def test_numbers_on_chunk_boundaries(document, expected):
+    for size in range(1, len(document) + 1):
+        assert list(iter_json_array(chunked(document, size))) == expected, size
+
+
+@pytest.mark.parametrize('document,expected', NUMERIC_DOCUMENTS)
+def test_numbers_in_object_field_on_chunk_boundaries(document, expected):
+    document = b'{"count": 12.5e1, "items": ' + document + b', "total": -3}'
+    for size in range(1, len(document) + 1):
+        assert list(iter_json_array(chunked(document, size), key='items')) == expected, size
+
+
+def test_async_numbers_on_chunk_boundaries():
+    async def chunks(parts):
+        for part in parts:
+            yield part
+
+    async def collect(size):
+        return [element async for element in aiter_json_array(chunks(chunked(b'[1, 2.5, 3]', size)))]
+
+    for size in range(1, 12):
+        assert asyncio.run(collect(size)) == [1, 2.5, 3], size
+
+
+def test_number_is_held_until_delimiter():
+    parser = JSONArrayParser()
+    assert parser.feed(b'[1, 2.') == [1]
+    assert parser.feed(b'5') == []
+    assert parser.feed(b']') == [2.5]
+    assert parser.done
+
+
+def test_truncated_number_is_incomplete():
+    with pytest.raises(ValueError):
+        list(iter_json_array([b'[1, 2.']))
+
+
+def test_invalid_number_is_rejected():
+    with pytest.raises(ValueError):
+        list(iter_json_array([b'[1, 2x]']))
@@ -0,0 +1,71 @@
+from decimal import Decimal
+
+import pytest
+
+from crix.models import Symbol, NewOrder
+from crix.validation import OrderValidator, OrderValidationError
+
+from fakes import symbol_json
+
+
+@pytest.fixture
+def validator():
+    return OrderValidator([Symbol.from_json(symbol_json('BTC_USDT', 'BTC', 'USDT', minLot='0.01', tickLot='0.01',
+                                                        minPrice='1', tickPrice='0.5', minNotional='10'))])
+
+
+def test_buy_price_snapped_down(validator):
+    order = validator.snap(NewOrder.limit('BTC_USDT', True, '100.4', '0.129'))
+    assert order.price == Decimal('100.0')
+    assert order.quantity == Decimal('0.12')
+
+
+def test_sell_price_snapped_up(validator):
+    order = validator.snap(NewOrder.limit('BTC_USDT', False, '100.1', '0.129'))
+    assert order.price == Decimal('100.5')
+    assert order.quantity == Decimal('0.12')
+
+
+def test_snapped_order_is_valid(validator):
+    order = validator.validate(NewOrder.limit('BTC_USDT', True, '100.3', '0.159'), snap=True)
+    assert (order.price, order.quantity) == (Decimal('100.0'), Decimal('0.15'))
+
+
+def test_order_on_grid_is_not_changed(validator):
+    order = NewOrder.limit('BTC_USDT', True, '100.5', '0.2')
+    assert validator.snap(order) is order
+
+
+def test_quantity_below_min_lot_after_snap(validator):
+    # 0.0099 is rounded down to 0.00
+    with pytest.raises(OrderValidationError) as info:
+        validator.validate(NewOrder.limit('BTC_USDT', True, '1000', '0.0099'), snap=True)
+    assert info.value.order.quantity == 0
+    assert info.value.reasons[0] == 'quantity 0.00 is less than 0.01'
+
+
+def test_tick_multiples(validator):
+    reasons = validator.check(NewOrder.limit('BTC_USDT', True, '100.3', '0.155'))
+    assert reasons == ('quantity 0.155 is not multiple of 0.01', 'price 100.3 is not multiple of 0.5')
+
+
+def test_min_notional(validator):
+    reasons = validator.check(NewOrder.limit('BTC_USDT', True, '50', '0.1'))
+    assert reasons == ('notional 5.0 is less than 10',)
+
+
+def test_market_order_skips_price_checks(validator):
+    order = NewOrder.market('BTC_USDT', True, '0.05')
+    assert validator.check(order) == ()
+    assert validator.snap(order).price == order.price
+
+
+def test_unknown_symbol(validator):
+    assert validator.check(NewOrder.limit('ETH_BTC', True, '1', '1')) == ('unknown symbol',)
+
+
+def test_validate_batch(validator):
+    valid, errors = validator.validate_batch([NewOrder.limit('BTC_USDT', True, '100', '0.2'),
+                                              NewOrder.limit('BTC_USDT', True, '100', '0.001')])
+    assert [order.quantity for order in valid] == [Decimal('0.2')]
+    assert [error.order.quantity for error in errors] == [Decimal('0.001')]